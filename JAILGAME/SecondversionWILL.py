@@ -1,9 +1,20 @@
+import os
 import pygame
 import time
 
-# Initialize Pygame
+from assets import load_image, load_pack_font, open_pack
+from dirty import DirtyRects
+from lod import lod_level
+from maps import MAPS_DIR, load_map
+from picking import RegionPicker
+from scheduler import FrameScheduler
+from startup import StartupTimer, init_pygame
+from text import GlyphAtlas, render_text
+
+# Initialize Pygame (only the display and font modules the game uses)
+startup_timer = StartupTimer()
 try:
-    pygame.init()
+    init_pygame()
 except Exception as e:
     print(f"Error initializing Pygame: {e}")
     exit()
@@ -16,6 +27,7 @@ try:
 except Exception as e:
     print(f"Error setting up display: {e}")
     exit()
+startup_timer.mark("display")
 
 # Colors
 WHITE = (255, 255, 255)
@@ -26,143 +38,104 @@ YELLOW = (255, 255, 0)
 
 # Load map image
 try:
-    map_image = pygame.image.load("europe_map.png")
-    map_image = pygame.transform.scale(map_image, (WIDTH, HEIGHT))
+    pack = open_pack((WIDTH, HEIGHT))  # Pre-scaled pixels and fonts from assets.py, if built
+    map_image = load_image("europe_map.png", (WIDTH, HEIGHT), pack)
 except FileNotFoundError:
     print("Error: europe_map.png not found. Please add a map image in the same directory.")
     exit()
 except Exception as e:
     print(f"Error loading map image: {e}")
     exit()
+startup_timer.mark("map")
 
 # Font
 try:
-    font = pygame.font.SysFont("arial", 20)
-    title_font = pygame.font.SysFont("arial", 30, bold=True)
+    font = load_pack_font("arial", 20, pack=pack)
+    title_font = load_pack_font("arial", 30, bold=True, pack=pack)
+    counter_glyphs = GlyphAtlas(font, BLACK)  # Money changes every second
 except Exception as e:
     print(f"Error loading font: {e}")
     exit()
+startup_timer.mark("fonts")
 
 # NEW: Message system for on-screen notifications
 message = ""
 message_timer = 0
 MESSAGE_DURATION = 3  # Seconds to display message
 
-# Point-in-polygon function for click detection
-def point_in_polygon(point, polygon):
-    x, y = point
-    n = len(polygon)
-    inside = False
-    px, py = polygon[0]
-    for i in range(n + 1):
-        sx, sy = polygon[i % n]
-        if y > min(py, sy) and y <= max(py, sy) and x <= max(px, sx):
-            if py != sy:
-                xinters = (y - py) * (sx - px) / (sy - py) + px
-            if px == sx or x <= xinters:
-                inside = not inside
-        px, py = sx, sy
-    return inside
-
-# NEW: Function to calculate polygon centroid for text positioning
-def get_polygon_centroid(polygon):
-    x_sum, y_sum, area = 0, 0, 0
-    n = len(polygon)
-    for i in range(n):
-        x0, y0 = polygon[i]
-        x1, y1 = polygon[(i + 1) % n]
-        cross = x0 * y1 - x1 * y0
-        area += cross
-        x_sum += (x0 + x1) * cross
-        y_sum += (y0 + y1) * cross
-    area /= 2
-    if area == 0:
-        return polygon[0]  # Fallback to first point if area is zero
-    x_sum /= (6 * area)
-    y_sum /= (6 * area)
-    return (int(x_sum), int(y_sum))
-
-# Country data: name, tax income per second, cost, polygon [(x1, y1), (x2, y2), ...]
-countries = {
-    "France": {
-        "tax": 10,
-        "cost": 100,
-        "polygon": [
-            (200, 300), (250, 250), (300, 250), (320, 300),
-            (300, 350), (250, 400), (200, 350), (180, 320)
-        ],
-        "owned": False
-    },
-    "Germany": {
-        "tax": 15,
-        "cost": 150,
-        "polygon": [
-            (350, 200), (400, 150), (450, 150), (470, 200),
-            (450, 250), (420, 300), (380, 300), (340, 250)
-        ],
-        "owned": False
-    },
-    "Spain": {
-        "tax": 8,
-        "cost": 80,
-        "polygon": [
-            (150, 400), (200, 350), (250, 350), (270, 400),
-            (250, 450), (200, 450), (150, 420)
-        ],
-        "owned": False
-    },
-    "Italy": {
-        "tax": 12,
-        "cost": 120,
-        "polygon": [
-            (320, 350), (350, 300), (380, 300), (400, 350),
-            (380, 400), (350, 450), (320, 400)
-        ],
-        "owned": False
-    },
-    "Poland": {
-        "tax": 7,
-        "cost": 70,
-        "polygon": [
-            (450, 200), (500, 150), (550, 150), (570, 200),
-            (550, 250), (500, 300), (450, 250)
-        ],
-        "owned": False
-    },
-}
+# Country data (maps/europe_classic.json): tax income per second, cost, outline
+countries = load_map(os.path.join(MAPS_DIR, "europe_classic.json"), (WIDTH, HEIGHT))
+for data in countries.values():
+    data["owned"] = False
+
+# The window shows the map at 1:1, so outlines are drawn and clicked at the
+# coarsest level of detail that is still exact to half a pixel
+MAP_LOD = lod_level(1.0)
+country_picker = RegionPicker.from_countries((WIDTH, HEIGHT), countries, MAP_LOD)  # Map clicks -> country
 
 # Player data
 money = 100
+owned_count = 0
 last_tax_time = time.time()
 selected_country = None
+dirty = DirtyRects()
+
+# Map layer: the map image with the country fills, outlines, highlight and
+# price labels, composited once into a display-format surface. It only
+# changes when a country is bought or selected, so a frame is a single blit.
+map_layer = None
+map_layer_key = None
+
+def draw_map_layer():
+    global map_layer, map_layer_key
+    key = (owned_count, selected_country)
+    if key != map_layer_key:
+        map_layer = map_image.convert()  # A display-format copy; never draw on the packed pixels
+        for country, data in countries.items():
+            polygon = data["lods"][MAP_LOD]
+            color = GREEN if data["owned"] else RED
+            pygame.draw.polygon(map_layer, color, polygon, 0)  # Filled
+            pygame.draw.polygon(map_layer, BLACK, polygon, 3)  # Black outline
+            if country == selected_country:
+                pygame.draw.polygon(map_layer, YELLOW, polygon, 5)  # Yellow highlight
+            # Display price for unowned countries
+            if not data["owned"]:
+                try:
+                    price_text = render_text(font, f"${data['cost']}", BLACK)
+                    text_rect = price_text.get_rect(center=data["centroid"])
+                    map_layer.blit(price_text, text_rect)
+                except Exception as e:
+                    print(f"Error rendering price for {country}: {e}")
+        map_layer_key = key
+        dirty.invalidate()
+    screen.blit(map_layer, (0, 0))
 
 # Game loop
 running = True
-clock = pygame.time.Clock()
+scheduler = FrameScheduler()
 
 while running:
     # Handle events
-    for event in pygame.event.get():
+    for event in scheduler.events():
         if event.type == pygame.QUIT:
             running = False
         elif event.type == pygame.MOUSEBUTTONDOWN:
             mouse_pos = pygame.mouse.get_pos()
-            selected_country = None
-            for country, data in countries.items():
-                if point_in_polygon(mouse_pos, data["polygon"]):
-                    selected_country = country
-                    if not data["owned"]:
-                        if money >= data["cost"]:
-                            money -= data["cost"]
-                            data["owned"] = True
-                            # NEW: Show purchase message on screen
-                            message = f"Bought {country}!"
-                            message_timer = current_time
-                        else:
-                            # NEW: Show error message on screen
-                            message = f"Not enough money to buy {country}!"
-                            message_timer = current_time
-                    break
+            selected_country = country_picker.pick(mouse_pos)
+            if selected_country is not None:
+                country, data = selected_country, countries[selected_country]
+                if not data["owned"]:
+                    if money >= data["cost"]:
+                        money -= data["cost"]
+                        data["owned"] = True
+                        owned_count += 1
+                        # NEW: Show purchase message on screen
+                        message = f"Bought {country}!"
+                        message_timer = current_time
+                    else:
+                        # NEW: Show error message on screen
+                        message = f"Not enough money to buy {country}!"
+                        message_timer = current_time
 
     # Collect taxes every second
     current_time = time.time()
@@ -172,62 +145,60 @@ while running:
         last_tax_time = current_time
 
     # Draw
-    screen.fill(WHITE)
-    screen.blit(map_image, (0, 0))
-
-    # Draw country borders and prices
-    for country, data in countries.items():
-        polygon = data["polygon"]
-        color = GREEN if data["owned"] else RED
-        pygame.draw.polygon(screen, color, polygon, 0)  # Filled
-        pygame.draw.polygon(screen, BLACK, polygon, 3)  # Black outline
-        if country == selected_country:
-            pygame.draw.polygon(screen, YELLOW, polygon, 5)  # Yellow highlight
-        # NEW: Display price for unowned countries
-        if not data["owned"]:
-            try:
-                price_text = font.render(f"${data['cost']}", True, BLACK)
-                centroid = get_polygon_centroid(polygon)
-                text_rect = price_text.get_rect(center=centroid)
-                screen.blit(price_text, text_rect)
-            except Exception as e:
-                print(f"Error rendering price for {country}: {e}")
+    draw_map_layer()
 
     # Display selected country name at top center
     if selected_country:
         try:
-            country_text = title_font.render(selected_country, True, BLACK)
+            country_text = render_text(title_font, selected_country, BLACK)
             text_rect = country_text.get_rect(center=(WIDTH // 2, 30))
             screen.blit(country_text, text_rect)
+            dirty.add(text_rect, selected_country)
         except Exception as e:
             print(f"Error rendering country name: {e}")
 
     # Display player stats
     try:
-        money_text = font.render(f"Money: ${money}", True, BLACK)
-        income_text = font.render(f"Income: ${sum(data['tax'] for data in countries.values() if data['owned'])}/s", True, BLACK)
-        owned_text = font.render(f"Owned: {sum(1 for data in countries.values() if data['owned'])}/{len(countries)}", True, BLACK)
-        screen.blit(money_text, (10, 10))
+        money_label = render_text(font, "Money: ", BLACK)
+        income_text = render_text(font, f"Income: ${sum(data['tax'] for data in countries.values() if data['owned'])}/s", BLACK)
+        owned_text = render_text(font, f"Owned: {owned_count}/{len(countries)}", BLACK)
+        screen.blit(money_label, (10, 10))
+        money_rect = counter_glyphs.draw(screen, f"${money}", topleft=(10 + money_label.get_width(), 10))
         screen.blit(income_text, (10, 40))
         screen.blit(owned_text, (10, 70))
+        dirty.add(money_rect, money)
+        dirty.add(income_text.get_rect(topleft=(10, 40)), ("income", owned_count))
+        dirty.add(owned_text.get_rect(topleft=(10, 70)), ("owned", owned_count))
     except Exception as e:
         print(f"Error rendering player stats: {e}")
 
     # NEW: Display on-screen message
     if message and current_time - message_timer < MESSAGE_DURATION:
         try:
-            message_text = font.render(message, True, BLACK)
+            message_text = render_text(font, message, BLACK)
             text_rect = message_text.get_rect(center=(WIDTH // 2, HEIGHT - 30))
             screen.blit(message_text, text_rect)
+            dirty.add(text_rect, message)
         except Exception as e:
             print(f"Error rendering message: {e}")
 
-    # Update display
+    # Push only the areas that changed since the last frame
+    screen_changed = True
     try:
-        pygame.display.flip()
+        screen_changed = dirty.present()
     except Exception as e:
         print(f"Error updating display: {e}")
-    clock.tick(60)
+    if startup_timer is not None:
+        startup_timer.mark("first frame")
+        startup_timer.report()
+        startup_timer = None
+
+    # Full frame rate while the screen is changing; otherwise sleep until
+    # input, the next tax collection or the message expiring
+    wake_times = [last_tax_time + 1 - current_time]
+    if message and current_time - message_timer < MESSAGE_DURATION:
+        wake_times.append(message_timer + MESSAGE_DURATION - current_time)
+    scheduler.wait(screen_changed, min(wake_times))
 
 # Quit
 try:
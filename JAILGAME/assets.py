@@ -0,0 +1,179 @@
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+from fileio import atomic_write
+from startup import font_entry, font_key, load_font
+
+# Asset pack for the game scripts. Decoding the map PNG and rescaling it is
+# most of what a launch spends before the first frame, so a build step packs
+# the images already scaled to the window size as raw pixels, together with
+# the font files, into one file. Only what a script loads is packed: the
+# classic script's map image and both scripts' fonts (the tiled script reads
+# its map from the tile pyramids instead, see tiles.py):
+#
+#   python assets.py            (re-run after changing a PNG or the window size)
+#
+# At startup the pack is memory-mapped and each image becomes a surface over
+# the mapped pixels with pygame.image.frombuffer(): no decode, no resample,
+# no copy. Pixels are stored as BGRA with alpha 255, the byte order of the
+# usual 32-bit display format, so blits need no conversion.
+#
+# Layout: header (magic, version, index length), a JSON index, then each
+# blob at an ALIGN-byte boundary. The index records the stat of every source
+# PNG; a pack whose sources changed is ignored and the PNGs are loaded as
+# before.
+
+PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets.pack")
+PACK_MAGIC = b"JGAP"
+PACK_VERSION = 1
+HEADER = struct.Struct("<4sII")  # magic, version, index length
+ALIGN = 64
+PIXEL_FORMAT = "BGRA"
+
+IMAGES = {"europe_map": "europe_map.png"}
+FONTS = [("arial", False, False), ("arial", True, False)]
+DEFAULT_SIZE = (800, 600)
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def build_pack(path=PACK_PATH, size=DEFAULT_SIZE, base_dir=None):
+    base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
+    blobs = []
+    index = {"size": list(size), "images": {}, "fonts": {}}
+    for name, filename in IMAGES.items():
+        source = os.path.join(base_dir, filename)
+        image = pygame.transform.scale(pygame.image.load(source), size)
+        # Opaque, like the .convert() the scripts used to do
+        pixels = bytearray(pygame.image.tobytes(image, PIXEL_FORMAT))
+        pixels[3::4] = b"\xff" * (len(pixels) // 4)
+        index["images"][name] = {"source": filename, "stamp": _source_stamp(source), "blob": len(blobs)}
+        blobs.append(bytes(pixels))
+    for name, bold, italic in FONTS:
+        entry = font_entry(name, bold, italic)
+        packed = {"fake_bold": entry["fake_bold"], "fake_italic": entry["fake_italic"], "blob": None}
+        # pygame's own default font stays Font(None, size), which pygame sizes differently
+        if entry["path"] is not None:
+            with open(entry["path"], "rb") as f:
+                packed["blob"] = len(blobs)
+                blobs.append(f.read())
+        index["fonts"][font_key(name, bold, italic)] = packed
+
+    # Blob offsets are relative to the data section, which starts at the
+    # first ALIGN boundary after the index
+    offset = 0
+    spans = []
+    for blob in blobs:
+        spans.append([offset, len(blob)])
+        offset = _aligned(offset + len(blob))
+    index["blobs"] = spans
+    index_bytes = json.dumps(index).encode()
+    data_start = _aligned(HEADER.size + len(index_bytes))
+
+    pack = bytearray(HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index_bytes)) + index_bytes)
+    for blob, (offset, length) in zip(blobs, spans):
+        pack += b"\0" * (data_start + offset - len(pack))
+        pack += blob
+    atomic_write(path, pack)
+    return index
+
+
+class AssetPack:
+    def __init__(self, path=PACK_PATH):
+        with open(path, "rb") as f:
+            # ACCESS_COPY: frombuffer needs a writable buffer; pages are only
+            # copied if something draws on a pack surface
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, index_length = HEADER.unpack_from(self.data)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f"{path} is not a version {PACK_VERSION} asset pack")
+        self.index = json.loads(bytes(self.data[HEADER.size:HEADER.size + index_length]))
+        self.size = tuple(self.index["size"])
+        self.data_start = _aligned(HEADER.size + index_length)
+        self.view = memoryview(self.data)
+
+    def _blob(self, number):
+        offset, length = self.index["blobs"][number]
+        start = self.data_start + offset
+        return self.view[start:start + length]
+
+    def is_current(self, base_dir):
+        # False once any source PNG has changed since the pack was built
+        for entry in self.index["images"].values():
+            source = os.path.join(base_dir, entry["source"])
+            if not os.path.exists(source) or _source_stamp(source) != entry["stamp"]:
+                return False
+        return True
+
+    def has_image(self, name):
+        return name in self.index["images"]
+
+    def image(self, name):
+        image = pygame.image.frombuffer(self._blob(self.index["images"][name]["blob"]), self.size, PIXEL_FORMAT)
+        image.set_alpha(None)  # Alpha is always 255; blit without blending
+        return image
+
+    def has_font(self, name, bold=False, italic=False):
+        return font_key(name, bold, italic) in self.index["fonts"]
+
+    def font(self, name, size, bold=False, italic=False):
+        entry = self.index["fonts"][font_key(name, bold, italic)]
+        source = None if entry["blob"] is None else io.BytesIO(self._blob(entry["blob"]))
+        font = pygame.font.Font(source, size)
+        font.set_bold(entry["fake_bold"])
+        font.set_italic(entry["fake_italic"])
+        return font
+
+
+def open_pack(size, path=PACK_PATH):
+    # The pack if it exists, matches the window size and is up to date, else None
+    if not os.path.exists(path):
+        return None
+    try:
+        pack = AssetPack(path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring asset pack: {e}")
+        return None
+    if pack.size != tuple(size) or not pack.is_current(os.path.dirname(os.path.abspath(path))):
+        print("Asset pack is out of date, loading PNGs instead (rebuild with: python assets.py)")
+        return None
+    return pack
+
+
+def load_image(filename, size, pack=None):
+    # Packed surface when available, otherwise decode and scale the PNG
+    name = os.path.splitext(filename)[0]
+    if pack is not None and pack.has_image(name):
+        return pack.image(name)
+    return pygame.transform.scale(pygame.image.load(filename), size).convert()
+
+
+def load_pack_font(name, size, bold=False, italic=False, pack=None):
+    if pack is not None and pack.has_font(name, bold, italic):
+        return pack.font(name, size, bold, italic)
+    return load_font(name, size, bold, italic)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mapped asset pack the game scripts load at startup.")
+    parser.add_argument("--width", type=int, default=DEFAULT_SIZE[0])
+    parser.add_argument("--height", type=int, default=DEFAULT_SIZE[1])
+    parser.add_argument("--output", default=PACK_PATH)
+    args = parser.parse_args()
+
+    index = build_pack(args.output, (args.width, args.height))
+    print(f"Packed {len(index['images'])} images and {len(index['fonts'])} fonts at {args.width}x{args.height} "
+          f"into {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
@@ -0,0 +1,51 @@
+# Derived views of the game state that the region table can't answer by
+# itself: owned countries without a business, income per business type and
+# the income listing. The engine reports each country whose ownership,
+# members or business changed, and only that country's entries are patched;
+# cached lists are rebuilt lazily, and only after their contents actually
+# changed. Nothing here scales with map size on a frame where nothing happened.
+#
+# Per-country ownership, members and income live in the RegionTable
+# (regions.py) and nowhere else; this class writes them there, and the table
+# keeps the whole-map totals (income, owned count and names).
+
+
+class DerivedState:
+    def __init__(self, regions, business_types):
+        self.regions = regions
+        self.vacant = set()  # Owned countries without a business
+        self.business_type = {}  # country -> type of its business
+        self.income_by_type = {business_type: 0 for business_type in business_types}
+        self._cache = {}
+
+    def update(self, country, owned, business_type, gang_members, income):
+        # Patch the table and indexes for one country and drop the views that changed
+        vacant = owned and business_type is None
+        if vacant != (country in self.vacant):
+            (self.vacant.add if vacant else self.vacant.discard)(country)
+            self.invalidate("vacant")
+        old_income = self.regions.income_of(country)
+        old_type = self.business_type.pop(country, None)
+        if old_type is not None:
+            self.income_by_type[old_type] -= old_income
+        if business_type is not None:
+            self.business_type[country] = business_type
+            self.income_by_type[business_type] += income
+        if old_type is not None or business_type is not None:
+            self.invalidate("sources")
+        self.regions.set_owned(country, owned)
+        self.regions.set_gang_members(country, gang_members)
+        self.regions.set_income(country, income)
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self._cache.pop(key, None)
+
+    def cached(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def vacant_list(self):
+        # Map order, so dialogs list countries the same way every time
+        return self.cached("vacant", lambda: sorted(self.vacant, key=self.regions.index.__getitem__))
@@ -0,0 +1,37 @@
+import pygame
+
+# Dirty-rectangle presentation for the game scripts. A frame is still composed
+# on the screen surface (mostly one blit of the cached map layer), but only
+# the areas whose contents changed are pushed to the window with
+# pygame.display.update() instead of flipping all 800x600 pixels.
+#
+# Every drawn element is reported with its rect and a key describing what it
+# shows (its text, hover state, ...). An element in the same place with the
+# same key as last frame is clean; anything new, changed or gone has its rect
+# repainted. Keys must be hashable.
+
+
+class DirtyRects:
+    def __init__(self):
+        self.previous = set()
+        self.current = set()
+        self.full = True  # The first frame always goes out whole
+
+    def add(self, rect, key=None):
+        self.current.add((tuple(rect), key))
+
+    def invalidate(self):
+        # The next present() repaints the whole window, e.g. after the map changed
+        self.full = True
+
+    def present(self):
+        # Returns whether anything on screen changed this frame
+        changed = self.previous ^ self.current
+        if self.full:
+            pygame.display.flip()
+        elif changed:
+            pygame.display.update([pygame.Rect(rect) for rect, key in changed])
+        updated = self.full or bool(changed)
+        self.previous, self.current = self.current, set()
+        self.full = False
+        return updated
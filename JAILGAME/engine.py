@@ -0,0 +1,458 @@
+import copy
+import time
+from datetime import datetime, timedelta
+
+from derived import DerivedState
+from maps import load_map
+from regions import RegionTable
+from registry import BusinessRegistry, GangRegistry
+from spatial import SpatialIndex
+
+# Headless game rules for the Europe Conquest game.
+# Nothing in here imports pygame, so the economy can be driven from scripts
+# and tools at full speed; the pygame window is just a client on top of it.
+
+# Prices and fees
+GANG_MEMBER_COST = 150
+GANG_MEMBER_SELL_PRICE = 90
+BUSINESS_COST = 500
+BUSINESS_CANCEL_FEE = 700
+MEMBER_INCOME_BONUS = 0.1  # +10% business income per gang member in the country
+
+# Interest rates for borrowing (logical, not random)
+# Interest is charged per second when debt > 0, scaled by amount
+BORROW_INTEREST_RATES = {
+    100: 0.001,    # 0.1% per second (~$0.10/s for $100)
+    500: 0.0015,   # 0.15% per second (~$0.75/s for $500)
+    1000: 0.002,   # 0.2% per second (~$2/s for $1000)
+    5000: 0.0025,  # 0.25% per second (~$12.50/s for $5000)
+    10000: 0.003,  # 0.3% per second (~$30/s for $10000)
+}
+
+# Business income rates (per second, base rate)
+BUSINESS_INCOME_RATES = {
+    "Gun Production": 100,
+    "Local Business Takeover": 50,
+    "Drug Production": 150,
+    "Tax Frauds": 75,
+}
+
+# Timers (seconds of game time)
+# Income and interest are both paid on the one-second economy tick
+ECONOMY_TICK = 1
+DATE_UPDATE_INTERVAL = 5
+START_DATE = datetime(2010, 12, 2)
+
+# Every tunable number in one place; GameEngine(rules=...) takes overrides so
+# balance tools can try other values without editing the constants above.
+DEFAULT_RULES = {
+    "gang_member_cost": GANG_MEMBER_COST,
+    "gang_member_sell_price": GANG_MEMBER_SELL_PRICE,
+    "business_cost": BUSINESS_COST,
+    "business_cancel_fee": BUSINESS_CANCEL_FEE,
+    "member_income_bonus": MEMBER_INCOME_BONUS,
+    "borrow_interest_rates": BORROW_INTEREST_RATES,
+    "business_income_rates": BUSINESS_INCOME_RATES,
+    "country_costs": {},  # country -> cost, overriding the map data
+}
+
+
+def make_rules(overrides=None, countries=None):
+    # Table overrides may only change existing entries (country_costs: the
+    # countries of the map, when given), so a typo fails instead of doing nothing
+    rules = copy.deepcopy(DEFAULT_RULES)
+    for key, value in (overrides or {}).items():
+        if key not in rules:
+            raise KeyError(f"Unknown rule: {key}")
+        if isinstance(rules[key], dict):
+            known = countries if key == "country_costs" else rules[key]
+            unknown = [entry for entry in value if known is not None and entry not in known]
+            if unknown:
+                raise KeyError(f"Unknown {key} entries: {', '.join(map(str, unknown))}")
+            rules[key].update(value)
+        else:
+            rules[key] = value
+    return rules
+
+
+# Country data (maps/europe.json): cost, population and outline per country,
+# plus the compiled bounding box and label centroid
+COUNTRIES = load_map()
+
+
+class GameEngine:
+    def __init__(self, countries=None, vectorized=None, rules=None):
+        countries = countries or COUNTRIES
+        self.rules = make_rules(rules, countries)
+        # Country state: per-game fields on top of the static map data. The
+        # outlines, boxes and LODs are shared by every game and never written,
+        # so only the entry itself is copied.
+        self.countries = {}
+        for country, data in countries.items():
+            entry = dict(data)
+            entry["cost"] = self.rules["country_costs"].get(country, entry["cost"])
+            entry["owned"] = False
+            self.countries[country] = entry
+        # Per-country ownership, members and income, in columns, with the
+        # vectorized totals (income, owned count and population)
+        self.regions = RegionTable.from_countries(self.countries, vectorized)
+        # Vacant list and per-type income, patched one country at a time
+        self.derived = DerivedState(self.regions, self.rules["business_income_rates"])
+
+        # Player data
+        self.money = 0
+        self.gang = GangRegistry(self.countries)  # Members by stable id
+        self.reputation = 0
+        self.bank_debt = 0
+        self.bank_interest = 0  # Total interest owed
+        self.first_purchase = True
+        self.first_bought_country = None  # HQ location
+
+        # Business tracking
+        self.businesses = BusinessRegistry(self.countries, self.rules["business_income_rates"])
+
+        # Game clock (seconds of unpaused play) and fixed-timestep accumulators
+        self.game_time = 0.0
+        self.ticks = 0
+        self.tick_accumulator = 0.0
+        self.date_accumulator = 0.0
+        self.current_date = START_DATE
+
+        self._spatial = None  # Built on the first map query
+
+    # ---- Queries ----
+
+    # Lists returned here are shared caches; treat them as read-only.
+
+    def owned_countries(self):
+        return self.regions.owned_names()
+
+    def owned_countries_without_business(self):
+        return self.derived.vacant_list()
+
+    def owned_count(self):
+        # Countries are never sold, so the owned count identifies the ownership
+        # state; the clients key their cached map layers on it
+        return self.regions.owned_count()
+
+    def owned_population(self):
+        return self.regions.owned_population()
+
+    def income_per_second(self):
+        return self.regions.total_income()
+
+    def business_in(self, country):
+        # Business type running in a country, or None
+        return self.businesses.type_at(country)
+
+    def country_income(self, country):
+        return self.regions.income_of(country)
+
+    def income_sources(self):
+        # (business id, type, country, income/s) for every business, in start order
+        return self.derived.cached("sources", lambda: [
+            (business_id, business_type, country, self.regions.income_of(country))
+            for business_id, business_type, country in self.businesses.listing()])
+
+    def income_for_type(self, business_type):
+        return self.derived.income_by_type[business_type]
+
+    def interest_rate(self):
+        # Every tier at or below the current debt adds its rate
+        return sum(rate for amount, rate in self.rules["borrow_interest_rates"].items() if amount <= self.bank_debt)
+
+    def country_price(self, country):
+        return 0 if self.first_purchase else self.countries[country]["cost"]
+
+    def spatial_index(self):
+        if self._spatial is None:
+            self._spatial = SpatialIndex.from_countries(self.countries)
+        return self._spatial
+
+    def country_at(self, point):
+        # Country whose polygon contains the map point, or None
+        return self.spatial_index().locate(point)
+
+    def countries_at(self, points):
+        # country_at() for a batch of points (needs NumPy)
+        index = self.spatial_index()
+        return [index.names[region_id] for region_id in index.locate_many(points)]
+
+    def date_string(self):
+        return self.current_date.strftime("%d.%m.%Y")
+
+    def time_to_next_change(self):
+        # Game seconds until the next date change, or the next economy tick if
+        # that would move money or interest. Clients can sleep until then.
+        waits = [DATE_UPDATE_INTERVAL - self.date_accumulator]
+        if self.income_per_second() or self.bank_debt > 0:
+            waits.append(ECONOMY_TICK - self.tick_accumulator)
+        return min(waits)
+
+    # ---- Simulation ----
+
+    def step(self, dt):
+        # Advance the game clock by dt seconds. Time is banked in accumulators so
+        # fractions carry over and a long frame pays every tick it covered.
+        ticks, self.tick_accumulator, days, self.date_accumulator = self._split_span(dt)
+        self.game_time += dt
+        if ticks:
+            self.apply_ticks(ticks)
+        if days:
+            self.current_date += timedelta(days=days)
+
+    def _split_span(self, dt):
+        # Whole economy ticks and calendar days covered by dt, plus the leftovers
+        tick_time = self.tick_accumulator + dt
+        ticks = int(tick_time // ECONOMY_TICK)
+        date_time = self.date_accumulator + dt
+        days = int(date_time // DATE_UPDATE_INTERVAL)
+        return ticks, tick_time - ticks * ECONOMY_TICK, days, date_time - days * DATE_UPDATE_INTERVAL
+
+    def _interest_for(self, ticks):
+        # Interest accrues on the principal only, so it is linear in the tick count
+        if self.bank_debt <= 0:
+            return 0
+        return ticks * self.bank_debt * self.interest_rate()
+
+    def apply_ticks(self, ticks):
+        # Income and debt can't change between ticks, so n ticks are one multiply
+        self.money += ticks * self.income_per_second()
+        self.bank_interest += self._interest_for(ticks)
+        self.ticks += ticks
+
+    def forecast(self, seconds):
+        # Money, interest owed and date after `seconds` of play with no actions,
+        # in constant time and without changing the game
+        ticks, _, days, _ = self._split_span(seconds)
+        return {
+            "money": self.money + ticks * self.income_per_second(),
+            "bank_interest": self.bank_interest + self._interest_for(ticks),
+            "date": self.current_date + timedelta(days=days),
+            "ticks": ticks,
+            "days": days,
+        }
+
+    def fast_forward(self, seconds):
+        # Skip ahead (e.g. time away from the game) and report what changed
+        money, interest, date = self.money, self.bank_interest, self.current_date
+        self.step(seconds)
+        return {
+            "seconds": seconds,
+            "income": self.money - money,
+            "interest": self.bank_interest - interest,
+            "days": (self.current_date - date).days,
+            "date": self.current_date,
+        }
+
+    # ---- Saving ----
+
+    def snapshot(self):
+        # The player's state as immutable values for saves.py. Registry
+        # records are never edited in place, so shallow dict copies are a
+        # consistent snapshot: no walk over the gang or businesses here.
+        return {
+            "money": self.money,
+            "reputation": self.reputation,
+            "bank_debt": self.bank_debt,
+            "bank_interest": self.bank_interest,
+            "first_purchase": self.first_purchase,
+            "first_bought_country": self.first_bought_country,
+            "game_time": self.game_time,
+            "ticks": self.ticks,
+            "tick_accumulator": self.tick_accumulator,
+            "date_accumulator": self.date_accumulator,
+            "current_date": self.current_date,
+            "owned": tuple(self.owned_countries()),
+            "gang_next_id": self.gang.next_id,
+            "gang": self.gang.members.copy(),  # id -> (name, country)
+            "business_next_id": self.businesses.next_id,
+            "businesses": self.businesses.businesses.copy(),  # id -> (type, country)
+        }
+
+    def restore(self, state):
+        # Load a snapshot() into a new game
+        places = set(state["owned"])
+        places.update(country for name, country in state["gang"].values() if country is not None)
+        places.update(country for business_type, country in state["businesses"].values())
+        unknown = places - set(self.countries)
+        if unknown:
+            raise ValueError(f"Unknown countries in saved game: {', '.join(sorted(unknown))}")
+        unknown = {business_type for business_type, country in state["businesses"].values()
+                   if business_type not in self.rules["business_income_rates"]}
+        if unknown:
+            raise ValueError(f"Unknown businesses in saved game: {', '.join(sorted(unknown))}")
+
+        for country in state["owned"]:
+            self.countries[country]["owned"] = True
+        for member_id, (name, country) in state["gang"].items():
+            self.gang.add(name, member_id)
+            if country is not None:
+                self.gang.assign(member_id, country)
+        self.gang.next_id = state["gang_next_id"]
+        for business_id, (business_type, country) in state["businesses"].items():
+            self.businesses.add(business_type, country, business_id)
+        self.businesses.next_id = state["business_next_id"]
+        for country in places:
+            self._country_changed(country)
+
+        for key in ("money", "reputation", "bank_debt", "bank_interest", "first_purchase",
+                    "first_bought_country", "game_time", "ticks", "tick_accumulator",
+                    "date_accumulator", "current_date"):
+            setattr(self, key, state[key])
+
+    # ---- Actions ----
+    # Every action returns (success, message) so clients can show feedback.
+
+    def _business_income(self, country):
+        business_type = self.businesses.type_at(country)
+        if not business_type:
+            return 0
+        num_members = self.gang.count_in(country)
+        base_income = self.rules["business_income_rates"][business_type]
+        return int(base_income * (1 + num_members * self.rules["member_income_bonus"]))
+
+    def _country_changed(self, country):
+        # Recompute one country's derived numbers after an action touched it
+        self.derived.update(country, self.countries[country]["owned"], self.businesses.type_at(country),
+                            self.gang.count_in(country), self._business_income(country))
+
+    def buy_country(self, country):
+        data = self.countries[country]
+        if data["owned"]:
+            return False, f"You already own {country}!"
+        cost = self.country_price(country)
+        if self.money < cost:
+            return False, f"Not enough money to buy {country}!"
+        self.money -= cost
+        data["owned"] = True
+        self._country_changed(country)
+        if self.first_purchase:
+            self.first_purchase = False
+            self.first_bought_country = country
+        return True, f"Bought {country}!"
+
+    def buy_gang_member(self):
+        if self.money < self.rules["gang_member_cost"]:
+            return False, "Not enough money to buy a gang member!"
+        self.money -= self.rules["gang_member_cost"]
+        self.gang.add()
+        return True, "Bought a new gang member!"
+
+    # Members are addressed by the stable ids from self.gang
+
+    def sell_gang_member(self, member_id):
+        if member_id not in self.gang:
+            return False, "No such gang member"
+        if self.gang.country_of(member_id) is not None:
+            return False, "Unassign a gang member before selling them!"
+        sold_member = self.gang.remove(member_id)
+        price = self.rules["gang_member_sell_price"]
+        self.money += price
+        return True, f"Sold {sold_member.name} for ${price}!"
+
+    def assign_member(self, member_id, country):
+        if member_id not in self.gang:
+            return False, "No such gang member"
+        if not self.countries[country]["owned"]:
+            return False, f"You don't own {country}!"
+        old_country = self.gang.country_of(member_id)
+        member = self.gang.assign(member_id, country)
+        if old_country is not None:
+            self._country_changed(old_country)
+        self._country_changed(country)
+        return True, f"Assigned {member.name} to {country}!"
+
+    def unassign_member(self, member_id):
+        if member_id not in self.gang:
+            return False, "No such gang member"
+        country = self.gang.country_of(member_id)
+        if country is None:
+            return False, "That gang member isn't assigned anywhere!"
+        member = self.gang.unassign(member_id)
+        self._country_changed(country)
+        return True, f"Unassigned {member.name} from {country}!"
+
+    def start_business(self, business_type):
+        # Pays for a business; it starts earning once placed with place_business
+        cost = self.rules["business_cost"]
+        if self.money < cost:
+            return False, f"Need at least ${cost} to start a business!"
+        self.money -= cost
+        return True, f"Selected {business_type}! ${cost} deducted."
+
+    # Businesses are addressed by the stable ids from self.businesses
+
+    def place_business(self, business_type, country):
+        if not self.countries[country]["owned"] or self.businesses.at(country) is not None:
+            return False, f"Can't put a business in {country}!"
+        self.businesses.add(business_type, country)
+        self._country_changed(country)
+        return True, f"Assigned {business_type} to {country}!"
+
+    def relocate_business(self, business_id, country):
+        if business_id not in self.businesses:
+            return False, "No such business"
+        if not self.countries[country]["owned"] or self.businesses.at(country) is not None:
+            return False, f"Can't move a business to {country}!"
+        old_country = self.businesses.get(business_id).country
+        business = self.businesses.move(business_id, country)
+        self._country_changed(old_country)
+        self._country_changed(country)
+        return True, f"Relocated {business.type} to {country}!"
+
+    def cancel_business(self, business_id):
+        fee = self.rules["business_cancel_fee"]
+        if self.money < fee or business_id not in self.businesses:
+            return False, "Not enough money or no business to cancel!"
+        self.money -= fee
+        business = self.businesses.remove(business_id)
+        country = business.country
+        self._country_changed(country)
+        return True, f"Cancelled {business.type} in {country} for ${fee}!"
+
+    def borrow(self, amount):
+        self.money += amount
+        self.bank_debt += amount
+        return True, f"Borrowed ${amount} from the bank!"
+
+    def pay_debt(self):
+        if self.bank_debt <= 0:
+            return False, "You have no debt to pay!"
+        if self.money < self.bank_debt + self.bank_interest:
+            return False, "Not enough money to pay debt and interest!"
+        self.money -= self.bank_debt + self.bank_interest
+        message = f"Paid off ${self.bank_debt} debt and ${self.bank_interest} interest!"
+        self.bank_debt = 0
+        self.bank_interest = 0
+        return True, message
+
+    def change_hq(self, country):
+        if not self.countries[country]["owned"]:
+            return False, f"You don't own {country}!"
+        self.first_bought_country = country
+        return True, f"HQ location changed to {country}!"
+
+
+# Monotonic frame clock for clients. tick() returns the seconds of unpaused
+# time since the previous call, so a paused game never builds up a backlog.
+class GameClock:
+    def __init__(self):
+        self.last = time.monotonic()
+        self.paused = False
+        self.banked = 0.0  # Played time from before a pause, not yet returned
+
+    def tick(self):
+        now = time.monotonic()
+        dt = self.banked + (0.0 if self.paused else now - self.last)
+        self.banked = 0.0
+        self.last = now
+        return dt
+
+    def set_paused(self, paused):
+        # Bank any running time first so pausing and resuming lose nothing;
+        # the next tick() pays it out
+        if paused and not self.paused:
+            self.banked = self.tick()
+        self.paused = paused
+        self.last = time.monotonic()
@@ -0,0 +1,34 @@
+import os
+
+# File writes shared by the caches, the asset pack and saved games.
+
+
+def atomic_write(path, data):
+    # Replace path with data (bytes or str) atomically and durably: written to
+    # a temporary name, fsynced and renamed over the old file, so a crash or
+    # an interrupted run never leaves half a file. The temporary name is per
+    # process, since tournament and sweep workers may write the same cache.
+    temporary = f"{path}.{os.getpid()}.tmp"
+    mode = "wb" if isinstance(data, (bytes, bytearray, memoryview)) else "w"
+    try:
+        with open(temporary, mode) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+    try:  # Make the rename itself durable (POSIX only)
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except (OSError, AttributeError):
+        return
+    try:
+        os.fsync(directory)
+    except OSError:
+        pass
+    finally:
+        os.close(directory)
@@ -0,0 +1,123 @@
+import math
+
+# Level-of-detail outlines for map regions. Every region gets one simplified
+# outline per tolerance in LOD_TOLERANCES (Douglas-Peucker, in map pixels);
+# level 0 is always the untouched source outline. Drawing and hit-testing
+# use lod_level(zoom): the coarsest level whose error stays under
+# MAX_SCREEN_ERROR screen pixels at that zoom.
+#
+# Shared borders stay aligned: outlines are cut into arcs at junctions
+# (vertices where the set of regions sharing them changes), and each arc is
+# simplified once and reused by every region that has it, so neighbours
+# never open gaps or overlaps along a common border. This relies on
+# neighbours sharing the exact border vertices, as topological map data does.
+
+LOD_TOLERANCES = (0.0, 0.5, 1.0, 2.0, 4.0)
+MAX_SCREEN_ERROR = 0.5
+
+
+def lod_level(zoom, tolerances=LOD_TOLERANCES, max_error=MAX_SCREEN_ERROR):
+    # zoom: screen pixels per map pixel
+    level = 0
+    for i, tolerance in enumerate(tolerances):
+        if tolerance * zoom <= max_error:
+            level = i
+    return level
+
+
+def segment_distance(point, start, end):
+    (x, y), (x0, y0), (x1, y1) = point, start, end
+    dx, dy = x1 - x0, y1 - y0
+    if dx == 0 and dy == 0:
+        return math.hypot(x - x0, y - y0)
+    t = max(0.0, min(1.0, ((x - x0) * dx + (y - y0) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(x - (x0 + t * dx), y - (y0 + t * dy))
+
+
+def simplify_line(points, tolerance):
+    # Douglas-Peucker on an open line; both endpoints are always kept
+    if tolerance <= 0 or len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        farthest, distance = None, tolerance
+        for i in range(first + 1, last):
+            d = segment_distance(points[i], points[first], points[last])
+            if d > distance:
+                farthest, distance = i, d
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def _ring(polygon):
+    # Outline without repeated points or the closing copy of the first vertex
+    ring = []
+    for point in polygon:
+        point = tuple(point)
+        if not ring or point != ring[-1]:
+            ring.append(point)
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        ring.pop()
+    return ring
+
+
+def _junctions(rings):
+    owners = {}
+    for name, ring in rings.items():
+        for point in ring:
+            owners.setdefault(point, set()).add(name)
+    fixed = set()
+    for ring in rings.values():
+        seen = set()
+        for i, point in enumerate(ring):
+            # Where a shared border starts or ends, or where a ring touches itself
+            if (owners[point] != owners[ring[i - 1]] or owners[point] != owners[ring[(i + 1) % len(ring)]]
+                    or len(owners[point]) > 2 or point in seen):
+                fixed.add(point)
+            seen.add(point)
+    for ring in rings.values():
+        # Islands and rings with one or two junctions: pin enough points that
+        # no simplified outline can collapse below a triangle
+        if sum(point in fixed for point in ring) < 3:
+            fixed.update(ring[i * len(ring) // 3] for i in range(3))
+    return fixed
+
+
+def _arcs(ring, fixed):
+    # The ring cut at its fixed points; each arc includes both ends
+    starts = [i for i, point in enumerate(ring) if point in fixed]
+    arcs = []
+    for first, last in zip(starts, starts[1:] + [starts[0] + len(ring)]):
+        arcs.append(tuple(ring[i % len(ring)] for i in range(first, last + 1)))
+    return arcs
+
+
+def build_lods(polygons, tolerances=LOD_TOLERANCES):
+    # polygons: {name: outline}. Returns {name: [outline per tolerance]}.
+    rings = {name: _ring(polygon) for name, polygon in polygons.items()}
+    fixed = _junctions(rings)
+    arcs = {name: _arcs(ring, fixed) if len(ring) >= 3 else None for name, ring in rings.items()}
+    lods = {name: [list(polygon)] for name, polygon in polygons.items()}
+    for tolerance in tolerances[1:]:
+        simplified = {}
+        for name, ring_arcs in arcs.items():
+            if ring_arcs is None:  # Degenerate outline: nothing to simplify
+                lods[name].append(list(polygons[name]))
+                continue
+            ring = []
+            for arc in ring_arcs:
+                # Simplify each border once, in one canonical direction, so
+                # both neighbours get exactly the same points
+                canonical = min(arc, arc[::-1])
+                if canonical not in simplified:
+                    simplified[canonical] = simplify_line(canonical, tolerance)
+                line = simplified[canonical] if canonical == arc else simplified[canonical][::-1]
+                ring.extend(line[:-1])
+            lods[name].append(ring)
+    return lods
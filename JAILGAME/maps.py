@@ -0,0 +1,170 @@
+import array
+import hashlib
+import json
+import os
+import struct
+
+from fileio import atomic_write
+from lod import build_lods
+
+# Map data for the game. Countries (costs, populations or taxes, outlines)
+# live in data files under maps/ instead of dict literals in the scripts:
+#
+#   JSON     {"countries": {name: {"cost": ..., "polygon": [[x, y], ...]}}}
+#            with polygons already in window pixels
+#   GeoJSON  a FeatureCollection of Polygon/MultiPolygon features with the
+#            country name and numbers in "properties", in lon/lat; projected
+#            equirectangularly so the collection's "bbox" (or its extent)
+#            fills the window
+#
+# Everything derived from a source (projected outlines, bounding boxes,
+# label centroids, the simplified LOD outlines from lod.py) is compiled into
+# a binary cache file keyed by a hash of the source bytes and the window
+# size, so a launch reads one small file and skips parsing, projecting and
+# simplifying. Nothing here imports pygame.
+
+MAPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps")
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".map_cache")
+CACHE_VERSION = 2  # Bump when the compiled layout changes
+CACHE_MAGIC = b"JGMC"
+HEADER = struct.Struct("<4sIII")  # magic, version, metadata length, vertex count
+DEFAULT_MAP = os.path.join(MAPS_DIR, "europe.json")
+DEFAULT_SIZE = (800, 600)
+
+
+def polygon_centroid(polygon):
+    # Area centroid in whole pixels, used to place price labels
+    x_sum, y_sum, area = 0, 0, 0
+    n = len(polygon)
+    for i in range(n):
+        x0, y0 = polygon[i]
+        x1, y1 = polygon[(i + 1) % n]
+        cross = x0 * y1 - x1 * y0
+        area += cross
+        x_sum += (x0 + x1) * cross
+        y_sum += (y0 + y1) * cross
+    area /= 2
+    if area == 0:
+        return polygon[0]
+    x_sum /= (6 * area)
+    y_sum /= (6 * area)
+    return (int(x_sum), int(y_sum))
+
+
+def polygon_bbox(polygon):
+    xs = [x for x, y in polygon]
+    ys = [y for x, y in polygon]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def _ring_area(ring):
+    return abs(sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1]))) / 2
+
+
+def _read_geojson(source, size):
+    regions = {}
+    for feature in source["features"]:
+        properties = dict(feature["properties"])
+        name = properties.pop("name")
+        geometry = feature["geometry"]
+        if geometry["type"] == "Polygon":
+            ring = geometry["coordinates"][0]
+        elif geometry["type"] == "MultiPolygon":
+            # The game has one outline per country: keep the largest part
+            ring = max((part[0] for part in geometry["coordinates"]), key=_ring_area)
+        else:
+            raise ValueError(f"{name}: unsupported geometry {geometry['type']}")
+        regions[name] = (properties, ring)
+
+    if "bbox" in source:
+        west, south, east, north = source["bbox"][:4]
+    else:
+        west, south, east, north = polygon_bbox([point for properties, ring in regions.values() for point in ring])
+    width, height = size
+    countries = {}
+    for name, (properties, ring) in regions.items():
+        polygon = [(round((lon - west) / (east - west) * width), round((north - lat) / (north - south) * height))
+                   for lon, lat in ring]
+        countries[name] = dict(properties, polygon=polygon)
+    return countries
+
+
+def read_map(data, size=DEFAULT_SIZE):
+    # Parse source bytes into {name: {..., "polygon": [(x, y), ...]}}
+    source = json.loads(data)
+    if source.get("type") == "FeatureCollection":
+        return _read_geojson(source, size)
+    return {name: dict(entry, polygon=[(round(x), round(y)) for x, y in entry["polygon"]])
+            for name, entry in source["countries"].items()}
+
+
+def compile_map(countries):
+    # Adds the derived geometry to each entry; entry["lods"][0] is the polygon
+    lods = build_lods({name: entry["polygon"] for name, entry in countries.items()})
+    for name, entry in countries.items():
+        entry["bbox"] = polygon_bbox(entry["polygon"])
+        entry["centroid"] = polygon_centroid(entry["polygon"])
+        entry["lods"] = lods[name]
+    return countries
+
+
+def _cache_path(data, size):
+    digest = hashlib.sha256(data)
+    digest.update(f"{size[0]}x{size[1]}:{CACHE_VERSION}".encode())
+    return os.path.join(CACHE_DIR, digest.hexdigest()[:32] + ".bin")
+
+
+def _write_cache(path, countries):
+    vertices = array.array("i")
+    meta = []
+    for name, entry in countries.items():
+        fields = {key: value for key, value in entry.items() if key not in ("polygon", "bbox", "centroid", "lods")}
+        spans = []
+        for outline in entry["lods"]:
+            spans.append((len(vertices) // 2, len(outline)))
+            for x, y in outline:
+                vertices.extend((round(x), round(y)))
+        meta.append([name, fields, spans, entry["bbox"], entry["centroid"]])
+    meta_bytes = json.dumps(meta).encode()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    atomic_write(path, HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(meta_bytes), len(vertices) // 2)
+                 + meta_bytes + vertices.tobytes())
+
+
+def _read_cache(path):
+    with open(path, "rb") as f:
+        magic, version, meta_length, vertex_count = HEADER.unpack(f.read(HEADER.size))
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            return None
+        meta = json.loads(f.read(meta_length))
+        vertices = array.array("i")
+        vertices.fromfile(f, vertex_count * 2)
+    countries = {}
+    for name, fields, spans, bbox, centroid in meta:
+        lods = []
+        for start, count in spans:
+            flat = vertices[start * 2:(start + count) * 2]
+            lods.append(list(zip(flat[0::2], flat[1::2])))
+        countries[name] = dict(fields, polygon=lods[0], lods=lods, bbox=tuple(bbox), centroid=tuple(centroid))
+    return countries
+
+
+def load_map(path=DEFAULT_MAP, size=DEFAULT_SIZE, use_cache=True):
+    # {name: {..., "polygon", "bbox", "centroid", "lods"}} in file order
+    with open(path, "rb") as f:
+        data = f.read()
+    cache_path = _cache_path(data, size)
+    if use_cache and os.path.exists(cache_path):
+        try:
+            countries = _read_cache(cache_path)
+        except (OSError, ValueError, EOFError, struct.error):
+            countries = None  # Damaged cache: compile again below
+        if countries is not None:
+            return countries
+    countries = compile_map(read_map(data, size))
+    if use_cache:
+        try:
+            _write_cache(cache_path, countries)
+        except OSError:
+            pass  # Read-only install: compile on every launch
+    return countries
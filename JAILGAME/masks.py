@@ -0,0 +1,232 @@
+import argparse
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; it only speeds up validation
+    np = None
+
+from lod import segment_distance
+from maps import DEFAULT_MAP, DEFAULT_SIZE, MAPS_DIR, load_map
+from picking import RegionPicker, draw_ids, id_surface
+from spatial import SpatialIndex
+
+# Region-ID mask generator. Rasterizes a map's country polygons into an ID
+# mask at any resolution, where each pixel's 24-bit RGB value is the id of
+# the region drawn there (0 for none; ids count from 1 in map file order).
+# Big masks are cut into tiles and drawn in parallel. The same drawing code
+# builds the in-game click buffer (picking.py), so mask and picking agree.
+#
+#   python masks.py                          (maps/europe.json at 800x600)
+#   python masks.py --width 4096 --height 3072 --processes 8
+#   python masks.py --check                  (fail if the mask no longer matches the map)
+#
+# Next to the PNG goes a JSON legend with the id of every region and the
+# hash of the map file it came from. Every build is validated against the
+# geometry: every id is a known region, each region's pixel count matches
+# its visible area, and random points well inside or outside regions agree
+# with an exact point-in-polygon lookup.
+
+DEFAULT_TILE = 512
+TILE_MARGIN = 2  # Extra pixels drawn around each tile
+VALIDATION_SAMPLES = 2000
+REFERENCE_POINTS = 1_000_000  # Pixel centres tested for the area check
+REFERENCE_POINTS_SCALAR = 200_000  # The same without NumPy
+EDGE_MARGIN = 1.5  # Sample points this close to an outline (in mask pixels) are skipped
+
+
+def mask_paths(map_path):
+    base = os.path.splitext(os.path.basename(map_path))[0]
+    return os.path.join(MAPS_DIR, f"{base}_ids.png"), os.path.join(MAPS_DIR, f"{base}_ids.json")
+
+
+def scaled_regions(countries, size, map_size=DEFAULT_SIZE, lod=0):
+    # (region id, polygon in whole mask pixels) in map file order
+    sx, sy = size[0] / map_size[0], size[1] / map_size[1]
+    return [(region_id, [(round(x * sx), round(y * sy)) for x, y in data["lods"][lod]])
+            for region_id, data in enumerate(countries.values(), start=1)]
+
+
+def _draw_tile(args):
+    regions, rect = args
+    left, top, width, height = rect
+    # Only regions whose box reaches into the tile
+    visible = [(region_id, polygon) for region_id, polygon in regions
+               if min(x for x, y in polygon) < left + width + TILE_MARGIN
+               and max(x for x, y in polygon) >= left - TILE_MARGIN
+               and min(y for x, y in polygon) < top + height + TILE_MARGIN
+               and max(y for x, y in polygon) >= top - TILE_MARGIN]
+    # pygame's polygon fill is not exact at the left edge of a surface, so
+    # draw with a margin and keep only the inside
+    tile = id_surface((width + 2 * TILE_MARGIN, height + 2 * TILE_MARGIN))
+    draw_ids(tile, visible, (left - TILE_MARGIN, top - TILE_MARGIN))
+    inside = tile.subsurface((TILE_MARGIN, TILE_MARGIN, width, height))
+    return rect, pygame.image.tobytes(inside, "RGB")
+
+
+def build_mask(regions, size, tile=DEFAULT_TILE, processes=None):
+    jobs = [(regions, (left, top, min(tile, size[0] - left), min(tile, size[1] - top)))
+            for top in range(0, size[1], tile) for left in range(0, size[0], tile)]
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    if processes > 1:
+        with multiprocessing.Pool(processes) as pool:
+            tiles = pool.map(_draw_tile, jobs)
+    else:
+        tiles = map(_draw_tile, jobs)
+    mask = id_surface(size)
+    for (left, top, width, height), pixels in tiles:
+        mask.blit(pygame.image.frombytes(pixels, (width, height), "RGB"), (left, top))
+    return mask
+
+
+def _reference_areas(index, size):
+    # Visible area of every region (overlaps go to the earlier one) from an
+    # exact point-in-polygon test at pixel centres, on a grid coarse enough
+    # to keep the test quick. Returns (areas by id, grid step in pixels).
+    width, height = size
+    budget = REFERENCE_POINTS if np is not None else REFERENCE_POINTS_SCALAR
+    stride = max(1, math.ceil(math.sqrt(width * height / budget)))
+    points = [(x + stride / 2, y + stride / 2) for y in range(0, height, stride) for x in range(0, width, stride)]
+    if np is not None:
+        region_ids = index.locate_many(points).tolist()
+    else:
+        region_ids = [index.locate_id(point) for point in points]
+    areas = [0] * len(index.names)
+    for region_id in region_ids:
+        areas[region_id] += stride * stride
+    return areas, stride
+
+
+def _id_counts(mask):
+    # Pixel count per id, indexed by id
+    pixels = pygame.image.tobytes(mask, "RGB")
+    if np is not None:
+        rgb = np.frombuffer(pixels, dtype=np.uint8).reshape(-1, 3).astype(np.int64)
+        return np.bincount(rgb[:, 0] << 16 | rgb[:, 1] << 8 | rgb[:, 2]).tolist()
+    counts = {}
+    for i in range(0, len(pixels), 3):
+        region_id = pixels[i] << 16 | pixels[i + 1] << 8 | pixels[i + 2]
+        counts[region_id] = counts.get(region_id, 0) + 1
+    return [counts.get(region_id, 0) for region_id in range(max(counts) + 1)]
+
+
+def _near_outline(point, index):
+    x, y = point
+    for region_id in range(1, len(index.names)):
+        left, top, right, bottom = index.boxes[region_id]
+        if left - EDGE_MARGIN <= x <= right + EDGE_MARGIN and top - EDGE_MARGIN <= y <= bottom + EDGE_MARGIN:
+            polygon = index.polygons[region_id]
+            if any(segment_distance(point, a, b) < EDGE_MARGIN for a, b in zip(polygon, polygon[1:] + polygon[:1])):
+                return True
+    return False
+
+
+def validate_mask(mask, regions, names, samples=VALIDATION_SAMPLES, seed=0):
+    # Problems found, as readable strings; an empty list means the mask is good
+    problems = []
+    width, height = mask.get_size()
+    counts = _id_counts(mask)
+    if len(counts) > len(names) + 1:
+        problems.append(f"mask has unknown ids up to {len(counts) - 1}")
+    counts += [0] * (len(names) + 1 - len(counts))
+
+    index = SpatialIndex([(names[region_id - 1], polygon) for region_id, polygon in regions])
+    expected, stride = _reference_areas(index, (width, height))
+    for region_id, polygon in regions:
+        # Rasterizing and the sampled reference may each be off by about one
+        # pixel (one grid step) along the outline
+        perimeter = sum(math.dist(a, b) for a, b in zip(polygon, polygon[1:] + polygon[:1]))
+        if counts[region_id] == 0 and expected[region_id] > 0:
+            problems.append(f"{names[region_id - 1]} has no pixels")
+        elif abs(counts[region_id] - expected[region_id]) > perimeter * (1 + stride) + 4:
+            problems.append(f"{names[region_id - 1]} covers {counts[region_id]} px, "
+                            f"about {expected[region_id]:.0f} px expected")
+
+    rng = random.Random(seed)
+    for _ in range(samples):
+        point = (rng.uniform(0, width), rng.uniform(0, height))
+        if _near_outline(point, index):
+            continue
+        expected = index.locate_id(point)
+        found = mask.get_at_mapped((int(point[0]), int(point[1])))
+        if found != expected:
+            problems.append(f"point {point[0]:.1f},{point[1]:.1f} is id {found} in the mask, {expected} in the map")
+            break
+    return problems
+
+
+def _source_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def save_mask(mask, names, png_path, legend_path, map_path, lod=0):
+    pygame.image.save(mask, png_path)
+    legend = {"map": os.path.basename(map_path), "source_sha256": _source_hash(map_path), "lod": lod,
+              "size": list(mask.get_size()), "ids": {str(i): name for i, name in enumerate(names, start=1)}}
+    with open(legend_path, "w") as f:
+        json.dump(legend, f, indent=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rasterize map polygons into a region-ID mask and validate it.")
+    parser.add_argument("--map", default=DEFAULT_MAP, help="map file (JSON or GeoJSON)")
+    parser.add_argument("--width", type=int, default=DEFAULT_SIZE[0])
+    parser.add_argument("--height", type=int, default=DEFAULT_SIZE[1])
+    parser.add_argument("--lod", type=int, default=0, help="outline level of detail (see lod.py)")
+    parser.add_argument("--tile", type=int, default=DEFAULT_TILE)
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default=None, help="mask PNG (default: maps/<map>_ids.png)")
+    parser.add_argument("--check", action="store_true", help="compare with the existing mask instead of writing")
+    args = parser.parse_args()
+
+    size = (args.width, args.height)
+    png_path, legend_path = mask_paths(args.map)
+    if args.output:
+        png_path, legend_path = args.output, os.path.splitext(args.output)[0] + ".json"
+    countries = load_map(args.map)
+    names = list(countries)
+    regions = scaled_regions(countries, size, lod=args.lod)
+
+    start = time.perf_counter()
+    mask = build_mask(regions, size, args.tile, args.processes)
+    print(f"Rasterized {len(names)} regions at {size[0]}x{size[1]} in {time.perf_counter() - start:.2f}s")
+
+    problems = validate_mask(mask, regions, names)
+    if size == DEFAULT_SIZE:
+        # At window size the mask must be exactly the in-game click buffer
+        picker = RegionPicker.from_countries(size, countries, args.lod)
+        if pygame.image.tobytes(picker.ids, "RGB") != pygame.image.tobytes(mask, "RGB"):
+            problems.append("mask differs from the in-game click buffer")
+
+    if args.check:
+        if not os.path.exists(png_path) or not os.path.exists(legend_path):
+            problems.append(f"{png_path} or its legend is missing")
+        else:
+            with open(legend_path) as f:
+                legend = json.load(f)
+            if legend["source_sha256"] != _source_hash(args.map):
+                problems.append(f"{png_path} was built from a different version of {args.map}")
+            existing = pygame.image.load(png_path)
+            if existing.get_size() != size or (pygame.image.tobytes(existing, "RGB")
+                                               != pygame.image.tobytes(mask, "RGB")):
+                problems.append(f"{png_path} does not match the rasterized map")
+
+    for problem in problems:
+        print(f"  {problem}")
+    if problems:
+        sys.exit(1)
+    if not args.check:
+        save_mask(mask, names, png_path, legend_path, args.map, args.lod)
+        print(f"Wrote {png_path} and {legend_path}")
+    else:
+        print(f"{png_path} is up to date")
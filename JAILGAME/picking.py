@@ -0,0 +1,53 @@
+import pygame
+
+# Click-to-country picking for the game scripts. Testing a click against
+# every country polygon costs O(countries x vertices), so the polygons are
+# instead rasterized once into an ID buffer the size of the window: each
+# pixel holds the id of the region drawn there (0 for none). Resolving a
+# click or hover is then one pixel read, however many regions the map has.
+#
+# The buffer is a 32-bit surface whose low 24 bits are the id, so up to
+# 16 million regions fit. Where polygons overlap, the earlier region wins,
+# the same country a first-match polygon scan would have returned.
+
+ID_MASKS = (0xFF0000, 0x00FF00, 0x0000FF, 0)
+
+
+def id_surface(size):
+    surface = pygame.Surface(size, 0, 32, ID_MASKS)
+    surface.fill(0)
+    return surface
+
+
+def draw_ids(surface, regions, offset=(0, 0)):
+    # regions: (region id, polygon) pairs in id order. offset is the map
+    # position of the surface's top-left pixel, for drawing one tile of a
+    # larger buffer (masks.py); whole-pixel vertices keep tiles seamless.
+    ox, oy = offset
+    # Drawn back to front so earlier regions end up on top
+    for region_id, polygon in reversed(regions):
+        pygame.draw.polygon(surface, region_id, [(x - ox, y - oy) for x, y in polygon])
+
+
+class RegionPicker:
+    def __init__(self, size, regions):
+        # regions: (name, polygon) pairs; ids are assigned from 1 in this order
+        self.names = [None]
+        self.names.extend(name for name, polygon in regions)
+        self.ids = id_surface(size)
+        draw_ids(self.ids, [(region_id, polygon) for region_id, (name, polygon) in enumerate(regions, start=1)])
+
+    @classmethod
+    def from_countries(cls, size, countries, lod=0):
+        # lod: which of each country's "lods" outlines to rasterize (see lod.py)
+        return cls(size, [(name, data["lods"][lod]) for name, data in countries.items()])
+
+    def region_id(self, pos):
+        x, y = pos
+        if not (0 <= x < self.ids.get_width() and 0 <= y < self.ids.get_height()):
+            return 0
+        return self.ids.get_at_mapped((x, y))
+
+    def pick(self, pos):
+        # Name of the region under pos, or None
+        return self.names[self.region_id(pos)]
@@ -0,0 +1,109 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; plain lists are used without it
+    np = None
+
+# Struct-of-arrays table of the per-country numbers the economy changes:
+# ownership, gang member count and business income (stored nowhere else).
+# With NumPy each column is an array, so income totals, ownership counts and
+# owned population are one vectorized call however many regions the map has,
+# and batch clients (vec_env.py) copy the columns straight into observations.
+# Totals are cached until a column they read changes, so a tick where nothing
+# was bought or reassigned costs the same on a 5-region map as on a
+# 50,000-region one.
+
+
+class RegionTable:
+    def __init__(self, names, costs, populations, vectorized=None):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        if vectorized is None:
+            vectorized = np is not None
+        if vectorized and np is None:
+            raise ImportError("NumPy is required for a vectorized region table")
+        self.vectorized = vectorized
+        n = len(self.names)
+        if vectorized:
+            self.cost = np.array(costs, dtype=np.int64)
+            self.population = np.array(populations, dtype=np.int64)
+            self.owned = np.zeros(n, dtype=bool)
+            self.income = np.zeros(n, dtype=np.int64)
+            self.gang_members = np.zeros(n, dtype=np.int64)
+        else:
+            self.cost = list(costs)
+            self.population = list(populations)
+            self.owned = [False] * n
+            self.income = [0] * n
+            self.gang_members = [0] * n
+        self._totals = {}
+
+    @classmethod
+    def from_countries(cls, countries, vectorized=None):
+        return cls(countries.keys(),
+                   [data["cost"] for data in countries.values()],
+                   [data["population"] for data in countries.values()],
+                   vectorized)
+
+    def __len__(self):
+        return len(self.names)
+
+    # ---- Per-region updates ----
+
+    def set_owned(self, name, owned):
+        self.owned[self.index[name]] = owned
+        for key in ("income", "owned", "population", "names"):
+            self._totals.pop(key, None)
+
+    def set_income(self, name, income):
+        self.income[self.index[name]] = income
+        self._totals.pop("income", None)
+
+    def set_gang_members(self, name, count):
+        self.gang_members[self.index[name]] = count
+
+    # ---- Queries ----
+
+    def is_owned(self, name):
+        return bool(self.owned[self.index[name]])
+
+    def income_of(self, name):
+        return int(self.income[self.index[name]])
+
+    def _cached(self, key, compute):
+        if key not in self._totals:
+            self._totals[key] = compute()
+        return self._totals[key]
+
+    def total_income(self):
+        # Income only counts for owned regions
+        return self._cached("income", self._total_income)
+
+    def _total_income(self):
+        if self.vectorized:
+            return int(self.income[self.owned].sum())
+        return sum(income for income, owned in zip(self.income, self.owned) if owned)
+
+    def owned_count(self):
+        return self._cached("owned", self._owned_count)
+
+    def _owned_count(self):
+        if self.vectorized:
+            return int(np.count_nonzero(self.owned))
+        return sum(self.owned)
+
+    def owned_population(self):
+        return self._cached("population", self._owned_population)
+
+    def _owned_population(self):
+        if self.vectorized:
+            return int(self.population[self.owned].sum())
+        return sum(population for population, owned in zip(self.population, self.owned) if owned)
+
+    def owned_names(self):
+        # In table (map) order; a shared cached list, treat it as read-only
+        return self._cached("names", self._owned_names)
+
+    def _owned_names(self):
+        if self.vectorized:
+            return [self.names[i] for i in np.flatnonzero(self.owned)]
+        return [name for name, owned in zip(self.names, self.owned) if owned]
@@ -0,0 +1,155 @@
+from collections import namedtuple
+from itertools import islice
+
+# Keyed registries for things the player owns many of. Everything is stored
+# under a stable id handed out by a counter, so ids never shift when another
+# entry is removed, and every add/move/remove is a dict operation.
+# Dicts double as ordered sets (id -> None) to keep a stable display order.
+# Records are immutable tuples, replaced rather than edited, so a plain
+# dict.copy() of a registry is a consistent snapshot (see GameEngine.snapshot).
+
+Member = namedtuple("Member", "name country")  # country is None when unassigned
+Business = namedtuple("Business", "type country")
+
+
+class GangRegistry:
+    def __init__(self, countries):
+        self.next_id = 1
+        self.members = {}  # id -> Member
+        self.unassigned = {}
+        self.by_country = {country: {} for country in countries}
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, member_id):
+        return member_id in self.members
+
+    def add(self, name=None, member_id=None):
+        # member_id is only passed when restoring a saved game
+        if member_id is None:
+            member_id = self.next_id
+        self.next_id = max(self.next_id, member_id + 1)
+        self.members[member_id] = Member(name or f"Gang Member {member_id}", None)
+        self.unassigned[member_id] = None
+        return member_id
+
+    def remove(self, member_id):
+        member = self.members.pop(member_id)
+        self._index_for(member.country).pop(member_id)
+        return member
+
+    def assign(self, member_id, country):
+        member = self.members[member_id]
+        self._index_for(member.country).pop(member_id)
+        self.by_country[country][member_id] = None
+        member = self.members[member_id] = member._replace(country=country)
+        return member
+
+    def unassign(self, member_id):
+        member = self.members[member_id]
+        self._index_for(member.country).pop(member_id)
+        self.unassigned[member_id] = None
+        member = self.members[member_id] = member._replace(country=None)
+        return member
+
+    def _index_for(self, country):
+        return self.unassigned if country is None else self.by_country[country]
+
+    # ---- Queries ----
+
+    def name(self, member_id):
+        return self.members[member_id].name
+
+    def country_of(self, member_id):
+        return self.members[member_id].country
+
+    def count_in(self, country):
+        return len(self.by_country[country])
+
+    def unassigned_count(self):
+        return len(self.unassigned)
+
+    def first_unassigned(self):
+        return next(iter(self.unassigned), None)
+
+    def first_in(self, country):
+        return next(iter(self.by_country[country]), None)
+
+    def _roster_entries(self):
+        yield from ((member_id, self.members[member_id].name, None) for member_id in self.unassigned)
+        for country, members in self.by_country.items():
+            yield from ((member_id, self.members[member_id].name, country) for member_id in members)
+
+    def roster(self, limit=None):
+        # (id, name, country) for the first `limit` members: unassigned first,
+        # then by country in map order. Read straight from the indexes, so a
+        # screenful costs the same however big the gang is.
+        return list(islice(self._roster_entries(), limit))
+
+    def roster_row(self, row):
+        # Entry `row` of roster(), or None past the end
+        return next(islice(self._roster_entries(), row, None), None)
+
+
+class BusinessRegistry:
+    def __init__(self, countries, business_types):
+        self.next_id = 1
+        self.businesses = {}  # id -> Business
+        self.by_country = {}  # country -> id (one business per country)
+        self.by_type = {business_type: {} for business_type in business_types}
+        self._listing = None
+
+    def __len__(self):
+        return len(self.businesses)
+
+    def __contains__(self, business_id):
+        return business_id in self.businesses
+
+    def add(self, business_type, country, business_id=None):
+        # business_id is only passed when restoring a saved game
+        if business_id is None:
+            business_id = self.next_id
+        self.next_id = max(self.next_id, business_id + 1)
+        self.businesses[business_id] = Business(business_type, country)
+        self.by_country[country] = business_id
+        self.by_type[business_type][business_id] = None
+        self._listing = None
+        return business_id
+
+    def remove(self, business_id):
+        business = self.businesses.pop(business_id)
+        del self.by_country[business.country]
+        del self.by_type[business.type][business_id]
+        self._listing = None
+        return business
+
+    def move(self, business_id, country):
+        business = self.businesses[business_id]
+        del self.by_country[business.country]
+        self.by_country[country] = business_id
+        business = self.businesses[business_id] = business._replace(country=country)
+        self._listing = None
+        return business
+
+    # ---- Queries ----
+
+    def get(self, business_id):
+        return self.businesses[business_id]
+
+    def at(self, country):
+        return self.by_country.get(country)
+
+    def type_at(self, country):
+        business_id = self.by_country.get(country)
+        return None if business_id is None else self.businesses[business_id].type
+
+    def count_of_type(self, business_type):
+        return len(self.by_type[business_type])
+
+    def listing(self):
+        # (id, type, country) in start order. Cached until the next change.
+        if self._listing is None:
+            self._listing = [(business_id, business.type, business.country)
+                             for business_id, business in self.businesses.items()]
+        return self._listing
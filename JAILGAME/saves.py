@@ -0,0 +1,247 @@
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from engine import GameEngine
+from fileio import atomic_write
+
+# Saved games. A save is a small fixed header followed by the zlib-compressed
+# game state in a compact binary layout:
+#
+#   header   magic, format version, wall-clock time of the save, payload
+#            length and CRC-32 (of the compressed payload)
+#   payload  a string table (countries, business types and member names are
+#            stored once and referred to by index), the player's numbers,
+#            the owned countries as a count and string indexes, then the
+#            gang and businesses
+#
+# Loading checks the magic, version and CRC before decoding anything, so a
+# truncated or foreign file is reported instead of half-loaded. Saves are
+# written with fileio.atomic_write, so a crash mid-save leaves the previous
+# save intact.
+#
+# Autosaver keeps all of that off the frame: the game state is snapshotted on
+# the main thread (GameEngine.snapshot(), plain immutable values), and a
+# worker thread encodes, compresses, writes and fsyncs it.
+
+SAVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "savegame.jgs")
+SAVE_MAGIC = b"JGSV"
+SAVE_VERSION = 1
+HEADER = struct.Struct("<4sHdII")  # magic, version, saved at, payload length, crc32
+AUTOSAVE_INTERVAL = 30  # Seconds between autosaves
+NO_INDEX = 0xFFFFFFFF  # "None" in index fields (unassigned member, no HQ)
+
+# Money and interest are ints until interest (a float) touches them, so
+# numbers keep their type: a tag byte, then the value
+INT = struct.Struct("<cq")
+FLOAT = struct.Struct("<cd")
+U32 = struct.Struct("<I")
+
+
+class _Writer:
+    def __init__(self):
+        self.parts = []
+        self.strings = {}  # string -> index in the table
+
+    def uint(self, value):
+        self.parts.append(U32.pack(value))
+
+    def index(self, string):
+        # Table index of a string (or None), added to the table on first use
+        if string is None:
+            return self.uint(NO_INDEX)
+        if string not in self.strings:
+            self.strings[string] = len(self.strings)
+        self.uint(self.strings[string])
+
+    def number(self, value):
+        if isinstance(value, int):
+            self.parts.append(INT.pack(b"i", value))
+        else:
+            self.parts.append(FLOAT.pack(b"f", value))
+
+    def payload(self):
+        table = [U32.pack(len(self.strings))]
+        for string in self.strings:
+            data = string.encode("utf-8")
+            table.append(U32.pack(len(data)) + data)
+        return b"".join(table + self.parts)
+
+
+class _Reader:
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+        self.strings = [self.bytes(self.uint()).decode("utf-8") for _ in range(self.uint())]
+
+    def bytes(self, length):
+        if self.offset + length > len(self.data):
+            raise ValueError("Saved game is truncated")
+        data = self.data[self.offset:self.offset + length]
+        self.offset += length
+        return data
+
+    def uint(self):
+        return U32.unpack(self.bytes(U32.size))[0]
+
+    def index(self):
+        value = self.uint()
+        if value == NO_INDEX:
+            return None
+        if value >= len(self.strings):
+            raise ValueError("Saved game refers to a missing string")
+        return self.strings[value]
+
+    def number(self):
+        tag = self.bytes(1)
+        self.offset -= 1
+        if tag == b"i":
+            return INT.unpack(self.bytes(INT.size))[1]
+        if tag == b"f":
+            return FLOAT.unpack(self.bytes(FLOAT.size))[1]
+        raise ValueError("Saved game has a bad number")
+
+
+def encode_save(state, saved_at):
+    # Header and compressed payload for a GameEngine.snapshot()
+    out = _Writer()
+    for key in ("money", "reputation", "bank_debt", "bank_interest", "game_time", "ticks",
+                "tick_accumulator", "date_accumulator"):
+        out.number(state[key])
+    date = state["current_date"]
+    out.uint(date.toordinal())
+    out.uint(date.hour * 3600 + date.minute * 60 + date.second)
+    out.uint(1 if state["first_purchase"] else 0)
+    out.index(state["first_bought_country"])
+
+    owned = state["owned"]
+    out.uint(len(owned))
+    for country in owned:
+        out.index(country)
+
+    out.uint(state["gang_next_id"])
+    out.uint(len(state["gang"]))
+    for member_id, (name, country) in state["gang"].items():
+        out.uint(member_id)
+        out.index(name)
+        out.index(country)
+
+    out.uint(state["business_next_id"])
+    out.uint(len(state["businesses"]))
+    for business_id, (business_type, country) in state["businesses"].items():
+        out.uint(business_id)
+        out.index(business_type)
+        out.index(country)
+
+    payload = zlib.compress(out.payload())
+    return HEADER.pack(SAVE_MAGIC, SAVE_VERSION, saved_at, len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_save(data):
+    # (snapshot, saved_at) from encode_save() output; ValueError if unreadable
+    if len(data) < HEADER.size:
+        raise ValueError("Not a saved game")
+    magic, version, saved_at, length, crc = HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC:
+        raise ValueError("Not a saved game")
+    if version > SAVE_VERSION:
+        raise ValueError(f"Saved game is format {version}; this version reads up to {SAVE_VERSION}")
+    payload = data[HEADER.size:HEADER.size + length]
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise ValueError("Saved game is damaged")
+    try:
+        reader = _Reader(zlib.decompress(payload))
+    except zlib.error:
+        raise ValueError("Saved game is damaged")
+
+    state = {}
+    for key in ("money", "reputation", "bank_debt", "bank_interest", "game_time", "ticks",
+                "tick_accumulator", "date_accumulator"):
+        state[key] = reader.number()
+    day, seconds = reader.uint(), reader.uint()
+    state["current_date"] = datetime.fromordinal(day).replace(
+        hour=seconds // 3600, minute=seconds // 60 % 60, second=seconds % 60)
+    state["first_purchase"] = reader.uint() == 1
+    state["first_bought_country"] = reader.index()
+    state["owned"] = tuple(reader.index() for _ in range(reader.uint()))
+    state["gang_next_id"] = reader.uint()
+    state["gang"] = {reader.uint(): (reader.index(), reader.index()) for _ in range(reader.uint())}
+    state["business_next_id"] = reader.uint()
+    state["businesses"] = {reader.uint(): (reader.index(), reader.index()) for _ in range(reader.uint())}
+    return state, saved_at
+
+
+def save_game(game, path=SAVE_PATH):
+    atomic_write(path, encode_save(game.snapshot(), time.time()))
+
+
+def set_aside(path=SAVE_PATH):
+    # Renames a save that can't be loaded to path + ".bad", so the new game's
+    # autosave doesn't overwrite it; returns the new name. OSError if the
+    # rename fails.
+    bad_path = path + ".bad"
+    os.replace(path, bad_path)
+    return bad_path
+
+
+def load_game(path=SAVE_PATH, countries=None, rules=None):
+    # (game, wall-clock time it was saved). FileNotFoundError if there is no
+    # save, ValueError if it can't be read or doesn't fit the map.
+    with open(path, "rb") as f:
+        state, saved_at = decode_save(f.read())
+    game = GameEngine(countries, rules=rules)
+    game.restore(state)
+    return game, saved_at
+
+
+class Autosaver:
+    def __init__(self, path=SAVE_PATH, interval=AUTOSAVE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.last_save = time.monotonic()
+        self.error = None  # The exception of the last failed save, for the client to report
+        self._pending = None  # Newest (snapshot, saved_at) not yet written
+        self._closing = False
+        self._wake = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def save(self, game):
+        # Snapshot now; the worker writes it. A snapshot still waiting when a
+        # newer one arrives is simply replaced.
+        snapshot = (game.snapshot(), time.time())
+        with self._wake:
+            self._pending = snapshot
+            self._wake.notify()
+        self.last_save = time.monotonic()
+
+    def maybe_save(self, game):
+        if time.monotonic() - self.last_save >= self.interval:
+            self.save(game)
+
+    def close(self, game=None):
+        # Save one last time (if given the game) and wait for the write
+        if game is not None:
+            self.save(game)
+        with self._wake:
+            self._closing = True
+            self._wake.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while self._pending is None and not self._closing:
+                    self._wake.wait()
+                if self._pending is None:
+                    return
+                state, saved_at = self._pending
+                self._pending = None
+            try:
+                atomic_write(self.path, encode_save(state, saved_at))
+                self.error = None
+            except Exception as e:  # Any failure, not just I/O, must not stop later saves
+                self.error = e
@@ -0,0 +1,36 @@
+import pygame
+
+# Frame pacing for the game scripts. While the screen keeps changing the loop
+# runs at the full frame rate. Once a frame pushes nothing new, the loop
+# blocks in pygame.event.wait() until input arrives or until the next moment
+# the game itself changes (an economy tick, a new date, a message expiring),
+# so an idle or paused window uses next to no CPU.
+
+FRAME_RATE = 60
+
+
+class FrameScheduler:
+    def __init__(self, frame_rate=FRAME_RATE):
+        self.clock = pygame.time.Clock()
+        self.frame_rate = frame_rate
+        self.pending = []  # The event that ended a wait, handled next frame
+
+    def events(self):
+        events = self.pending + pygame.event.get()
+        self.pending = []
+        return events
+
+    def wait(self, busy, wake_in=None):
+        # busy: the last frame changed the screen, so keep the full rate.
+        # wake_in: seconds until the next scheduled change, None for never.
+        if busy:
+            self.clock.tick(self.frame_rate)
+            return
+        if wake_in is None:
+            event = pygame.event.wait()
+        else:
+            # Round up so the wait never ends just short of the change
+            event = pygame.event.wait(max(1, int(wake_in * 1000) + 1))
+        if event.type != pygame.NOEVENT:
+            self.pending.append(event)
+        self.clock.tick()
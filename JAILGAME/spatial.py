@@ -0,0 +1,192 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only locate_many() needs it
+    np = None
+
+BATCH_CHUNK = 65536  # Points per vectorized pass in locate_many()
+
+# Point-to-region lookup for maps with many regions. Region bounding boxes
+# are bucketed into a uniform grid, so a query only runs the exact
+# point-in-polygon test on the few regions whose boxes overlap its cell
+# instead of scanning every polygon.
+#
+# locate_many() classifies a whole batch of points with NumPy (hover
+# trails, AI target queries, tests): the grid expands the batch into
+# (point, candidate region) pairs and every edge crossing of every pair is
+# tested in one vectorized pass.
+#
+# Regions get ids from 1 in the order given (0 is no region). Where
+# polygons overlap, the earlier region wins, as in a first-match scan.
+
+
+def point_in_polygon(point, polygon):
+    # Even-odd rule; a point on a left or bottom edge counts as outside
+    x, y = point
+    n = len(polygon)
+    inside = False
+    px, py = polygon[0]
+    for i in range(n + 1):
+        sx, sy = polygon[i % n]
+        if y > min(py, sy) and y <= max(py, sy) and x <= max(px, sx):
+            if py != sy:
+                xinters = (y - py) * (sx - px) / (sy - py) + px
+            if px == sx or x <= xinters:
+                inside = not inside
+        px, py = sx, sy
+    return inside
+
+
+def points_in_polygon(xs, ys, polygon):
+    # Vectorized point_in_polygon over coordinate arrays, one pass per edge
+    if np is None:
+        raise ImportError("NumPy is required for points_in_polygon")
+    inside = np.zeros(len(xs), dtype=bool)
+    px, py = polygon[-1]
+    for sx, sy in polygon:
+        if py != sy:  # Horizontal edges never cross a scanline
+            crosses = (ys > min(py, sy)) & (ys <= max(py, sy)) & (xs <= max(px, sx))
+            if px != sx:
+                crosses &= xs <= (ys - py) * (sx - px) / (sy - py) + px
+            inside ^= crosses
+        px, py = sx, sy
+    return inside
+
+
+class SpatialIndex:
+    def __init__(self, regions, cell_size=None):
+        # regions: (name, polygon) pairs
+        self.names = [None]
+        self.polygons = [None]
+        self.boxes = [None]  # (min x, min y, max x, max y)
+        for name, polygon in regions:
+            xs = [x for x, y in polygon]
+            ys = [y for x, y in polygon]
+            self.names.append(name)
+            self.polygons.append(list(polygon))
+            self.boxes.append((min(xs), min(ys), max(xs), max(ys)))
+        self.ids = {name: region_id for region_id, name in enumerate(self.names) if region_id}
+        self._flat = None
+
+        boxes = self.boxes[1:]
+        if boxes:
+            self.origin = (min(box[0] for box in boxes), min(box[1] for box in boxes))
+            width = max(box[2] for box in boxes) - self.origin[0]
+            height = max(box[3] for box in boxes) - self.origin[1]
+        else:
+            self.origin, width, height = (0, 0), 0, 0
+        # Default to about one region per cell
+        self.cell_size = cell_size or max(1.0, math.sqrt(max(width * height, 1) / max(len(boxes), 1)))
+        self.columns = int(width // self.cell_size) + 1
+        self.rows = int(height // self.cell_size) + 1
+        # Flat cell number -> region ids whose box overlaps it, in region order
+        self.grid = {}
+        for region_id, box in enumerate(boxes, start=1):
+            left, top = self._cell(box[0], box[1])
+            right, bottom = self._cell(box[2], box[3])
+            for row in range(top, bottom + 1):
+                for column in range(left, right + 1):
+                    self.grid.setdefault(row * self.columns + column, []).append(region_id)
+
+    @classmethod
+    def from_countries(cls, countries, cell_size=None):
+        return cls([(name, data["polygon"]) for name, data in countries.items()], cell_size)
+
+    def _cell(self, x, y):
+        return int((x - self.origin[0]) // self.cell_size), int((y - self.origin[1]) // self.cell_size)
+
+    def candidates(self, point):
+        # Region ids whose bounding box contains point
+        x, y = point
+        column, row = self._cell(x, y)
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            return []
+        return [region_id for region_id in self.grid.get(row * self.columns + column, ())
+                if self.boxes[region_id][0] <= x <= self.boxes[region_id][2]
+                and self.boxes[region_id][1] <= y <= self.boxes[region_id][3]]
+
+    def locate_id(self, point):
+        for region_id in self.candidates(point):
+            if point_in_polygon(point, self.polygons[region_id]):
+                return region_id
+        return 0
+
+    def locate(self, point):
+        # Name of the region containing point, or None
+        return self.names[self.locate_id(point)]
+
+    def _arrays(self):
+        # Flat NumPy copies of the grid and the polygon edges, built on first use
+        if self._flat is None:
+            cell_regions = [self.grid.get(cell, ()) for cell in range(self.columns * self.rows)]
+            cell_start = np.zeros(len(cell_regions) + 1, dtype=np.int64)
+            cell_start[1:] = np.cumsum([len(ids) for ids in cell_regions])
+            edges = [[], [], [], []]
+            edge_start = np.zeros(len(self.names) + 1, dtype=np.int64)
+            for region_id in range(1, len(self.names)):
+                polygon = self.polygons[region_id]
+                for (px, py), (sx, sy) in zip(polygon[-1:] + polygon[:-1], polygon):
+                    if py != sy:  # Horizontal edges never cross a scanline
+                        for column, value in zip(edges, (px, py, sx, sy)):
+                            column.append(value)
+                edge_start[region_id + 1] = len(edges[0])
+            self._flat = {
+                "cell_start": cell_start,
+                "cell_regions": np.array([region_id for ids in cell_regions for region_id in ids], dtype=np.int64),
+                "boxes": np.array([(0, 0, -1, -1)] + self.boxes[1:], dtype=np.float64),
+                "edge_start": edge_start,
+                "edges": [np.array(column, dtype=np.float64) for column in edges],
+            }
+        return self._flat
+
+    def locate_many(self, points, chunk=BATCH_CHUNK):
+        # Region id for every (x, y) row of points, as an int array
+        if np is None:
+            raise ImportError("NumPy is required for locate_many")
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.zeros(len(points), dtype=np.int64)
+        for start in range(0, len(points), chunk):
+            result[start:start + chunk] = self._locate_chunk(points[start:start + chunk])
+        return result
+
+    def _locate_chunk(self, points):
+        # Every (point, candidate region) pair from the grid, then every
+        # (pair, edge) crossing test, all as flat arrays
+        flat = self._arrays()
+        xs, ys = points[:, 0], points[:, 1]
+        columns = np.floor((xs - self.origin[0]) / self.cell_size).astype(np.int64)
+        rows = np.floor((ys - self.origin[1]) / self.cell_size).astype(np.int64)
+        on_grid = np.flatnonzero((columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows))
+        cells = rows[on_grid] * self.columns + columns[on_grid]
+
+        pair_point, pair_region = _expand(on_grid, flat["cell_start"][cells], flat["cell_start"][cells + 1],
+                                          flat["cell_regions"])
+        boxes = flat["boxes"][pair_region]
+        px, py = xs[pair_point], ys[pair_point]
+        keep = (px >= boxes[:, 0]) & (px <= boxes[:, 2]) & (py >= boxes[:, 1]) & (py <= boxes[:, 3])
+        pair_point, pair_region = pair_point[keep], pair_region[keep]
+
+        pair, edge = _expand(np.arange(len(pair_point)), flat["edge_start"][pair_region],
+                             flat["edge_start"][pair_region + 1])
+        x, y = xs[pair_point[pair]], ys[pair_point[pair]]
+        x0, y0, x1, y1 = (column[edge] for column in flat["edges"])
+        crosses = (y > np.minimum(y0, y1)) & (y <= np.maximum(y0, y1)) & (x <= np.maximum(x0, x1))
+        crosses &= (x0 == x1) | (x <= (y - y0) * (x1 - x0) / (y1 - y0) + x0)
+        inside = np.bincount(pair, weights=crosses, minlength=len(pair_point)).astype(np.int64) % 2 == 1
+
+        # The earliest region containing a point wins
+        none = len(self.names)
+        result = np.full(len(points), none, dtype=np.int64)
+        np.minimum.at(result, pair_point[inside], pair_region[inside])
+        result[result == none] = 0
+        return result
+
+
+def _expand(owners, starts, ends, values=None):
+    # For each owner i, one row per index in starts[i]:ends[i]. Returns the
+    # repeated owners and the indices (or values[indices]).
+    counts = ends - starts
+    repeated = np.repeat(owners, counts)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    return repeated, offsets if values is None else values[offsets]
@@ -0,0 +1,122 @@
+import json
+import os
+import sys
+import time
+
+import pygame
+
+from fileio import atomic_write
+
+# Fast startup for the game scripts. pygame.init() also brings up audio and
+# joystick support the game never uses, and every SysFont() call can scan
+# the system font directories. Here only the display and font modules are
+# started, and font lookups are resolved once and remembered in a small
+# cache file, so later launches open the font files directly.
+#
+# StartupTimer records how long each phase took, appends every launch's
+# timings to STARTUP_LOG_PATH (one JSON object per line, so regressions show
+# up over time) and complains when launch to first frame goes over
+# STARTUP_BUDGET.
+
+STARTUP_BUDGET = 1.0  # Seconds from launch to the first frame on screen
+FONT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".font_cache.json")
+STARTUP_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".startup_log.jsonl")
+STARTUP_LOG_LIMIT = 256 * 1024  # Bytes; past this the older half of the log is dropped
+
+
+class StartupTimer:
+    def __init__(self, budget=STARTUP_BUDGET, log_path=STARTUP_LOG_PATH):
+        self.budget = budget
+        self.log_path = log_path
+        self.start = self.last = time.perf_counter()
+        self.phases = []  # (phase, seconds)
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def total(self):
+        return self.last - self.start
+
+    def report(self):
+        # Called once the first frame is up: logs the timings, and prints them
+        # only when over budget
+        self.log()
+        if self.total() > self.budget:
+            phases = ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.phases)
+            print(f"Startup took {self.total():.2f}s, over the {self.budget:.2f}s budget ({phases})")
+
+    def log(self):
+        entry = {"script": os.path.basename(sys.argv[0]), "time": round(time.time(), 3),
+                 "total": round(self.total(), 6), "budget": self.budget,
+                 "phases": {phase: round(seconds, 6) for phase, seconds in self.phases}}
+        try:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                size = f.tell()
+            if size > STARTUP_LOG_LIMIT:
+                with open(self.log_path) as f:
+                    lines = f.readlines()
+                atomic_write(self.log_path, "".join(lines[len(lines) // 2:]))
+        except OSError:
+            pass  # A read-only install just doesn't keep the history
+
+
+def init_pygame():
+    pygame.display.init()
+    pygame.font.init()
+
+
+_font_cache = None
+
+
+def _load_font_cache():
+    global _font_cache
+    if _font_cache is None:
+        try:
+            with open(FONT_CACHE_PATH) as f:
+                _font_cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _font_cache = {}
+    return _font_cache
+
+
+def _store_font_cache():
+    try:
+        atomic_write(FONT_CACHE_PATH, json.dumps(_font_cache, indent=1))
+    except OSError:
+        pass  # A read-only install just resolves fonts every launch
+
+
+def _resolve_font(name, bold, italic):
+    # Same choice SysFont makes: the styled file if the family has one,
+    # otherwise the plain file (or pygame's default font) styled by SDL_ttf
+    path = pygame.font.match_font(name, bold, italic)
+    plain = pygame.font.match_font(name) if bold or italic else path
+    styled = path is not None and path != plain
+    return {"path": path, "fake_bold": bold and not styled, "fake_italic": italic and not styled}
+
+
+def font_key(name, bold=False, italic=False):
+    return f"{name}:{int(bold)}:{int(italic)}"
+
+
+def font_entry(name, bold=False, italic=False):
+    # {path, fake_bold, fake_italic}; a path of None is pygame's default font
+    cache = _load_font_cache()
+    key = font_key(name, bold, italic)
+    entry = cache.get(key)
+    if entry is None or (entry["path"] is not None and not os.path.exists(entry["path"])):
+        entry = cache[key] = _resolve_font(name, bold, italic)
+        _store_font_cache()
+    return entry
+
+
+def load_font(name, size, bold=False, italic=False):
+    # Drop-in replacement for pygame.font.SysFont
+    entry = font_entry(name, bold, italic)
+    font = pygame.font.Font(entry["path"], size)
+    font.set_bold(entry["fake_bold"])
+    font.set_italic(entry["fake_italic"])
+    return font
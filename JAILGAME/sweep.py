@@ -0,0 +1,203 @@
+import argparse
+import copy
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import time
+
+from engine import COUNTRIES, DEFAULT_RULES, make_rules
+from fileio import atomic_write
+from tournament import STRATEGIES, DEFAULT_MAX_SECONDS, play_game
+
+# Balance sweep: varies the rule tables over a grid or random samples, plays
+# the tournament strategies on every configuration in parallel, and caches
+# each result on disk under a hash of everything that affects it. Re-running a
+# sweep with a few new points only simulates those points.
+#
+#   python sweep.py --grid gang_member_cost=100,150,200 --grid "business_income_rates.Drug Production=100,150"
+#   python sweep.py --random 40 --range business_cancel_fee=300:1000 --range country_costs.Germany=100:400
+#
+# Rule paths use dots to reach into tables (see engine.DEFAULT_RULES); a path
+# to an unknown rule, table entry or country is an error. Only the
+# reshuffler strategy sells gang members or cancels businesses, so it is the
+# one to watch when sweeping gang_member_sell_price or business_cancel_fee.
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sweep_cache")
+CACHE_VERSION = 2  # Bump when the cache file layout changes
+# Modules whose code decides a game's outcome; editing any of them (or the
+# map's prices, or DEFAULT_RULES) changes every cache key
+CODE_FILES = ("engine.py", "registry.py", "derived.py", "regions.py", "tournament.py")
+
+
+def _parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _rule_key(table, key):
+    # Interest tiers are keyed by int amounts, everything else by name
+    if any(isinstance(existing, int) for existing in table):
+        return int(key)
+    return key
+
+
+def set_rule(overrides, path, value):
+    keys = path.split(".")
+    if keys[0] not in DEFAULT_RULES:
+        raise KeyError(f"Unknown rule: {keys[0]}")
+    if len(keys) > 2 or (len(keys) == 2) != isinstance(DEFAULT_RULES[keys[0]], dict):
+        raise KeyError(f"Bad rule path: {path}")
+    if len(keys) == 1:
+        overrides[keys[0]] = value
+    else:
+        table = overrides.setdefault(keys[0], {})
+        table[_rule_key(DEFAULT_RULES[keys[0]], keys[1])] = value
+        make_rules(overrides, COUNTRIES)  # Raises on an unknown country or table entry
+    return overrides
+
+
+def grid_points(grid):
+    # grid: list of (path, [values]); returns every combination as overrides
+    points = [{}]
+    for path, values in grid:
+        points = [set_rule(copy.deepcopy(point), path, value) for point in points for value in values]
+    return points
+
+
+def random_points(ranges, samples, seed=0, base=None):
+    # ranges: list of (path, low, high); ints stay ints
+    rng = random.Random(seed)
+    points = []
+    for _ in range(samples):
+        point = copy.deepcopy(base or {})
+        for path, low, high in ranges:
+            if isinstance(low, int) and isinstance(high, int):
+                value = rng.randint(low, high)
+            else:
+                value = rng.uniform(low, high)
+            set_rule(point, path, value)
+        points.append(point)
+    return points
+
+
+def _code_digest():
+    digest = hashlib.sha256()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for filename in CODE_FILES:
+        with open(os.path.join(base_dir, filename), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+CODE_DIGEST = _code_digest()
+
+
+def config_hash(overrides, strategies, games, max_seconds, seed):
+    # Keyed by the rules the games actually run with, not just the overrides
+    payload = json.dumps({
+        "version": CACHE_VERSION,
+        "code": CODE_DIGEST,
+        "rules": make_rules(overrides, COUNTRIES),
+        "country_costs": {country: data["cost"] for country, data in COUNTRIES.items()},
+        "strategies": sorted(strategies),
+        "games": games,
+        "max_seconds": max_seconds,
+        "seed": seed,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def evaluate(args):
+    # Runs in a worker: every strategy, every game, one configuration
+    overrides, strategies, games, max_seconds, seed = args
+    summary = {}
+    for name in strategies:
+        results = [play_game(name, seed + i, max_seconds, overrides) for i in range(games)]
+        win_times = [r["win_time"] for r in results if r["win_time"] is not None]
+        summary[name] = {
+            "win_rate": len(win_times) / games,
+            "mean_win_time": statistics.fmean(win_times) if win_times else None,
+            "mean_peak_debt": statistics.fmean(r["peak_debt"] for r in results),
+            "mean_final_money": statistics.fmean(r["final_money"] for r in results),
+        }
+    return summary
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def load_cached(key):
+    try:
+        with open(_cache_path(key)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def store_cached(key, overrides, summary):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    atomic_write(_cache_path(key), json.dumps({"rules": overrides, "summary": summary}, default=str))
+
+
+def run_sweep(points, strategies, games, max_seconds=DEFAULT_MAX_SECONDS, processes=None, seed=0):
+    keys = [config_hash(point, strategies, games, max_seconds, seed) for point in points]
+    results = {}
+    missing = {}
+    for key, point in zip(keys, points):
+        cached = load_cached(key)
+        if cached is not None:
+            results[key] = cached["summary"]
+        else:
+            missing[key] = point
+    if missing:
+        jobs = [(point, strategies, games, max_seconds, seed) for point in missing.values()]
+        with multiprocessing.Pool(processes) as pool:
+            for (key, point), summary in zip(missing.items(), pool.imap(evaluate, jobs)):
+                store_cached(key, point, summary)
+                results[key] = summary
+    return [(point, results[key]) for key, point in zip(keys, points)], len(missing)
+
+
+def _parse_grid(text):
+    path, _, values = text.partition("=")
+    return path, [_parse_value(value) for value in values.split(",")]
+
+
+def _parse_range(text):
+    path, _, bounds = text.partition("=")
+    low, _, high = bounds.partition(":")
+    return path, _parse_value(low), _parse_value(high)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep balance parameters with cached, parallel simulations.")
+    parser.add_argument("--grid", action="append", default=[], type=_parse_grid, metavar="PATH=V1,V2,...")
+    parser.add_argument("--range", action="append", default=[], type=_parse_range, metavar="PATH=LOW:HIGH")
+    parser.add_argument("--random", type=int, default=0, metavar="N", help="random samples drawn from --range")
+    parser.add_argument("--games", type=int, default=200, help="games per strategy per configuration")
+    parser.add_argument("--max-seconds", type=int, default=DEFAULT_MAX_SECONDS)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    args = parser.parse_args()
+
+    points = grid_points(args.grid) if args.grid else [{}]
+    if args.random:
+        points = [sample for point in points for sample in random_points(args.range, args.random, args.seed, point)]
+
+    start = time.perf_counter()
+    results, simulated = run_sweep(points, args.strategies, args.games, args.max_seconds, args.processes, args.seed)
+    for point, summary in results:
+        print(json.dumps(point, default=str))
+        for name, stats in summary.items():
+            win_time = "n/a" if stats["mean_win_time"] is None else f"{stats['mean_win_time']:.0f}s"
+            print(f"  {name}: win {stats['win_rate']:.0%} in {win_time}, "
+                  f"peak debt ${stats['mean_peak_debt']:,.0f}, final money ${stats['mean_final_money']:,.0f}")
+    print(f"{len(points)} configurations, {simulated} simulated, "
+          f"{len(points) - simulated} from cache in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,43 @@
+import os
+import shutil
+
+import pygame
+
+from assets import AssetPack, build_pack, open_pack
+from startup import load_font
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIZE = (400, 300)
+
+
+def _pack(tmp_path):
+    shutil.copy(os.path.join(HERE, "europe_map.png"), tmp_path)
+    path = str(tmp_path / "assets.pack")
+    build_pack(path, SIZE, base_dir=str(tmp_path))
+    return path
+
+
+def test_packed_map_matches_the_scaled_png(tmp_path):
+    pack = open_pack(SIZE, _pack(tmp_path))
+    assert list(pack.index["images"]) == ["europe_map"]  # Nothing a script doesn't load
+    expected = pygame.transform.scale(pygame.image.load(str(tmp_path / "europe_map.png")), SIZE)
+    assert pygame.image.tobytes(pack.image("europe_map"), "RGB") == pygame.image.tobytes(expected, "RGB")
+
+
+def test_packed_fonts_match_the_system_fonts(tmp_path):
+    pygame.font.init()
+    pack = AssetPack(_pack(tmp_path))
+    for bold in (False, True):
+        assert pack.has_font("arial", bold=bold)
+        packed, system = pack.font("arial", 14, bold=bold), load_font("arial", 14, bold=bold)
+        assert packed.size("Money: $1,234") == system.size("Money: $1,234")
+
+
+def test_stale_or_wrong_size_packs_are_ignored(tmp_path):
+    path = _pack(tmp_path)
+    assert open_pack((800, 600), path) is None
+    source = str(tmp_path / "europe_map.png")
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert open_pack(SIZE, path) is None
+    assert open_pack(SIZE, str(tmp_path / "missing.pack")) is None
@@ -0,0 +1,45 @@
+import pygame
+
+from dirty import DirtyRects
+
+
+def _record(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pygame.display, "flip", lambda: calls.append("flip"))
+    monkeypatch.setattr(pygame.display, "update", lambda rects: calls.append(sorted(map(tuple, rects))))
+    return calls
+
+
+def test_only_changed_elements_are_pushed(monkeypatch):
+    calls = _record(monkeypatch)
+    dirty = DirtyRects()
+    dirty.add((0, 0, 10, 10), "money 5")
+    dirty.add((0, 20, 10, 10), "debt 0")
+    assert dirty.present()
+    dirty.add((0, 0, 10, 10), "money 5")
+    dirty.add((0, 20, 10, 10), "debt 0")
+    assert not dirty.present()
+    dirty.add((0, 0, 10, 10), "money 6")
+    dirty.add((0, 20, 10, 10), "debt 0")
+    assert dirty.present()
+    assert calls[0] == "flip" and set(calls[1]) == {(0, 0, 10, 10)}  # The debt label is left alone
+
+
+def test_moved_or_removed_elements_repaint_both_places(monkeypatch):
+    calls = _record(monkeypatch)
+    dirty = DirtyRects()
+    dirty.add((0, 0, 10, 10), "tooltip")
+    dirty.add((50, 50, 5, 5), "hover")
+    dirty.present()
+    dirty.add((5, 0, 10, 10), "tooltip")
+    dirty.present()
+    assert calls[-1] == [(0, 0, 10, 10), (5, 0, 10, 10), (50, 50, 5, 5)]
+
+
+def test_invalidate_flips_the_whole_window(monkeypatch):
+    calls = _record(monkeypatch)
+    dirty = DirtyRects()
+    dirty.present()
+    dirty.invalidate()
+    assert dirty.present()
+    assert calls == ["flip", "flip"]
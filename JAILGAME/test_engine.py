@@ -0,0 +1,186 @@
+import random
+import time
+
+from engine import ECONOMY_TICK, GameClock, GameEngine
+
+# Headless engine checks: the action rules the window used to apply inline,
+# the economy's shortcuts (forecast, fast_forward, batched ticks) against
+# plain stepping, and the derived totals against a recount after random play.
+
+
+def test_first_country_is_free_and_becomes_hq():
+    game = GameEngine()
+    country = next(iter(game.countries))
+    assert game.country_price(country) == 0
+    assert game.buy_country(country) == (True, f"Bought {country}!")
+    assert game.first_bought_country == country
+    assert game.buy_country(country)[0] is False  # Already owned
+
+
+def test_actions_refuse_without_money():
+    game = GameEngine()
+    names = list(game.countries)
+    game.buy_country(names[0])
+    assert game.buy_country(names[1])[0] is False
+    assert game.buy_gang_member()[0] is False
+    assert game.start_business("Tax Frauds")[0] is False
+    assert game.money == 0
+
+
+def test_borrow_and_pay_debt():
+    game = GameEngine()
+    game.borrow(1000)
+    assert game.money == 1000 and game.interest_rate() > 0
+    game.step(10)
+    assert game.bank_interest > 0
+    game.money += 100
+    assert game.pay_debt()[0]
+    assert game.bank_debt == 0 and game.bank_interest == 0
+    assert game.pay_debt()[0] is False
+
+
+def test_businesses_need_an_owned_country():
+    game = GameEngine()
+    game.money = 10_000
+    names = list(game.countries)
+    game.buy_country(names[0])
+    game.start_business("Gun Production")
+    assert game.place_business("Gun Production", names[1])[0] is False
+    assert game.place_business("Gun Production", names[0])[0]
+    assert game.income_per_second() > 0
+    assert game.place_business("Tax Frauds", names[0])[0] is False  # One per country
+
+
+def test_stale_member_ids_are_refused():
+    game = GameEngine()
+    game.money = 10_000
+    country = next(iter(game.countries))
+    game.buy_country(country)
+    game.buy_gang_member()
+    member_id = game.gang.first_unassigned()
+    assert game.sell_gang_member(member_id)[0]
+    assert game.sell_gang_member(member_id) == (False, "No such gang member")
+    assert game.assign_member(member_id, country) == (False, "No such gang member")
+    assert game.unassign_member(member_id) == (False, "No such gang member")
+    assert game.gang.count_in(country) == 0
+
+def test_stale_business_ids_are_refused():
+    game = GameEngine()
+    game.money = 10_000
+    names = list(game.countries)
+    game.buy_country(names[0])
+    game.buy_country(names[1])
+    game.start_business("Tax Frauds")
+    game.place_business("Tax Frauds", names[0])
+    business_id = game.businesses.at(names[0])
+    assert game.cancel_business(business_id)[0]
+    assert game.relocate_business(business_id, names[1]) == (False, "No such business")
+    assert game.businesses.at(names[1]) is None
+
+def _earning_game():
+    game = GameEngine()
+    game.money = 10_000
+    names = list(game.countries)
+    for country in names[:3]:
+        game.buy_country(country)
+    for business_type, country in zip(["Drug Production", "Tax Frauds"], names):
+        game.start_business(business_type)
+        game.place_business(business_type, country)
+    for _ in range(3):
+        game.buy_gang_member()
+    game.assign_member(game.gang.first_unassigned(), names[0])
+    game.borrow(1000)
+    return game
+
+
+def test_one_long_step_pays_every_tick():
+    stepped, jumped = _earning_game(), _earning_game()
+    for _ in range(40):
+        stepped.step(0.25)
+    jumped.step(10)
+    assert stepped.ticks == jumped.ticks == 10 // ECONOMY_TICK
+    assert stepped.money == jumped.money
+    assert stepped.current_date == jumped.current_date
+
+
+def test_game_clock_keeps_time_before_a_pause():
+    clock = GameClock()
+    clock.tick()
+    time.sleep(0.2)
+    clock.set_paused(True)
+    time.sleep(0.1)
+    clock.set_paused(False)
+    played = clock.tick()
+    assert 0.2 <= played < 0.3  # The paused 0.1 s is not counted
+
+
+def test_forecast_matches_stepping():
+    game = _earning_game()
+    forecast = game.forecast(123.4)
+    for _ in range(1234):
+        game.step(0.1)
+    assert game.money == forecast["money"]
+    assert abs(game.bank_interest - forecast["bank_interest"]) < 1e-6
+    assert game.current_date == forecast["date"]
+
+
+def test_fast_forward_reports_changes():
+    game = _earning_game()
+    money, date = game.money, game.current_date
+    report = game.fast_forward(3600)
+    assert report["income"] == game.money - money
+    assert report["days"] == (game.current_date - date).days
+    assert report["interest"] > 0
+
+
+def test_derived_state_matches_a_recount():
+    for vectorized in (False, None):
+        game = GameEngine(vectorized=vectorized)
+        game.money = 10 ** 7
+        rng = random.Random(1)
+        names = list(game.countries)
+        types = list(game.rules["business_income_rates"])
+        for _ in range(2000):
+            country = rng.choice(names)
+            action = rng.randrange(8)
+            if action == 0:
+                game.buy_country(country)
+            elif action == 1:
+                game.buy_gang_member()
+            elif action == 2 and len(game.gang):
+                game.assign_member(rng.choice(list(game.gang.members)), country)
+            elif action == 3 and len(game.gang):
+                game.unassign_member(rng.choice(list(game.gang.members)))
+            elif action == 4:
+                business_type = rng.choice(types)
+                game.start_business(business_type)
+                game.place_business(business_type, country)
+            elif action == 5 and len(game.businesses):
+                game.relocate_business(rng.choice(list(game.businesses.businesses)), country)
+            elif action == 6 and len(game.businesses):
+                game.cancel_business(rng.choice(list(game.businesses.businesses)))
+            elif action == 7 and len(game.gang):
+                game.sell_gang_member(rng.choice(list(game.gang.members)))
+
+            incomes = {country: game._business_income(country) for country in names}
+            assert game.income_per_second() == sum(incomes.values())
+            assert game.income_sources() == [(business_id, business_type, country, incomes[country])
+                                             for business_id, business_type, country in game.businesses.listing()]
+            for business_type in types:
+                assert game.income_for_type(business_type) == sum(
+                    incomes[country] for country in names if game.business_in(country) == business_type)
+            owned = [country for country in names if game.countries[country]["owned"]]
+            assert game.owned_countries() == owned
+            assert game.owned_count() == len(owned)
+            assert game.owned_population() == sum(game.countries[country]["population"] for country in owned)
+            assert game.owned_countries_without_business() == [
+                country for country in owned if game.business_in(country) is None]
+
+
+def test_games_share_map_geometry_but_not_state():
+    first, second = GameEngine(), GameEngine()
+    country = next(iter(first.countries))
+    first.money = 1000
+    first.buy_country(country)
+    assert not second.countries[country]["owned"]
+    assert first.countries[country]["lods"] is second.countries[country]["lods"]
@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from fileio import atomic_write
+
+
+def test_atomic_write_replaces_the_whole_file(tmp_path):
+    path = str(tmp_path / "data.bin")
+    atomic_write(path, b"first version")
+    atomic_write(path, b"second")
+    with open(path, "rb") as f:
+        assert f.read() == b"second"
+    atomic_write(path, "text too")
+    with open(path) as f:
+        assert f.read() == "text too"
+    assert os.listdir(tmp_path) == ["data.bin"]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.bin")
+    atomic_write(path, b"old")
+
+    def fail(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "fsync", fail)
+    with pytest.raises(OSError):
+        atomic_write(path, b"new")
+    with open(path, "rb") as f:
+        assert f.read() == b"old"
+    assert os.listdir(tmp_path) == ["data.bin"]
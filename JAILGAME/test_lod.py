@@ -0,0 +1,37 @@
+import math
+
+from lod import LOD_TOLERANCES, build_lods, lod_level, segment_distance, simplify_line
+
+
+def _jagged_border(steps=60):
+    # A wiggly line from (0, 0) to (0, 300), shared by two regions
+    return [(5 * math.sin(i * 0.7) + 2 * math.sin(i * 2.3), i * 5) for i in range(steps + 1)]
+
+
+def test_simplify_line_stays_within_tolerance():
+    line = _jagged_border()
+    for tolerance in LOD_TOLERANCES[1:]:
+        simplified = simplify_line(line, tolerance)
+        assert simplified[0] == line[0] and simplified[-1] == line[-1]
+        for point in line:
+            assert min(segment_distance(point, a, b) for a, b in zip(simplified, simplified[1:])) <= tolerance + 1e-9
+
+
+def test_shared_borders_stay_aligned():
+    border = _jagged_border()
+    west = [(-200, 300), (-200, 0)] + border
+    east = list(reversed(border)) + [(200, 0), (200, 300)]
+    lods = build_lods({"West": west, "East": east})
+    assert lods["West"][0] == west and lods["East"][0] == east
+    for level in range(1, len(LOD_TOLERANCES)):
+        shared_west = [point for point in lods["West"][level] if point in set(border)]
+        shared_east = [point for point in lods["East"][level] if point in set(border)]
+        assert sorted(shared_west) == sorted(shared_east)
+        assert len(shared_west) < len(border)  # Something was simplified
+        assert len(lods["West"][level]) >= 3
+
+
+def test_lod_level_gets_finer_with_zoom():
+    levels = [lod_level(zoom) for zoom in (0.1, 0.25, 0.5, 1, 2, 4)]
+    assert levels == sorted(levels, reverse=True)
+    assert lod_level(100) == 0
@@ -0,0 +1,28 @@
+import os
+
+import maps
+from maps import DEFAULT_MAP, load_map
+
+
+def test_cached_map_matches_a_fresh_compile(tmp_path, monkeypatch):
+    monkeypatch.setattr(maps, "CACHE_DIR", str(tmp_path))
+    fresh = load_map(DEFAULT_MAP, use_cache=False)
+    assert os.listdir(tmp_path) == []
+    compiled = load_map(DEFAULT_MAP)
+    cached = load_map(DEFAULT_MAP)
+    assert len(os.listdir(tmp_path)) == 1
+    for countries in (compiled, cached):
+        assert list(countries) == list(fresh)
+        for name, entry in fresh.items():
+            assert countries[name]["lods"] == [[(round(x), round(y)) for x, y in lod] for lod in entry["lods"]]
+            assert countries[name]["bbox"] == tuple(entry["bbox"]) and countries[name]["cost"] == entry["cost"]
+
+
+def test_damaged_cache_is_compiled_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(maps, "CACHE_DIR", str(tmp_path))
+    expected = load_map(DEFAULT_MAP)
+    (cache_file,) = tmp_path.iterdir()
+    cache_file.write_bytes(cache_file.read_bytes()[:40])
+    assert load_map(DEFAULT_MAP) == expected
+    load_map(DEFAULT_MAP, size=(400, 300))
+    assert len(os.listdir(tmp_path)) == 2  # The window size is part of the key
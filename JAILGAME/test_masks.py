@@ -0,0 +1,30 @@
+import pygame
+
+from engine import COUNTRIES
+from masks import build_mask, scaled_regions, validate_mask
+from picking import RegionPicker
+
+
+def _pixels(surface):
+    return pygame.image.tobytes(surface, "RGB")
+
+
+def test_tiled_mask_matches_a_single_tile():
+    for size in ((800, 600), (1031, 777)):
+        regions = scaled_regions(COUNTRIES, size)
+        whole = build_mask(regions, size, tile=max(size), processes=1)
+        for tile in (64, 100, 512):
+            assert _pixels(build_mask(regions, size, tile=tile, processes=1)) == _pixels(whole)
+
+
+def test_window_size_mask_is_the_click_buffer():
+    size = (800, 600)
+    mask = build_mask(scaled_regions(COUNTRIES, size), size, tile=128, processes=1)
+    assert _pixels(mask) == _pixels(RegionPicker.from_countries(size, COUNTRIES).ids)
+
+
+def test_mask_validates_against_the_map():
+    size = (1200, 900)
+    regions = scaled_regions(COUNTRIES, size)
+    mask = build_mask(regions, size, processes=1)
+    assert validate_mask(mask, regions, list(COUNTRIES), samples=500) == []
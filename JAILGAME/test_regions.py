@@ -0,0 +1,37 @@
+import pytest
+
+import regions
+from regions import RegionTable
+
+NAMES = ["Poland", "France", "Spain", "Italy"]
+
+
+def _tables():
+    tables = [RegionTable(NAMES, [100, 200, 300, 400], [10, 20, 30, 40], vectorized=False)]
+    if regions.np is not None:
+        tables.append(RegionTable(NAMES, [100, 200, 300, 400], [10, 20, 30, 40], vectorized=True))
+    return tables
+
+
+def test_totals_follow_the_columns():
+    for table in _tables():
+        assert (table.total_income(), table.owned_count(), table.owned_population()) == (0, 0, 0)
+        table.set_owned("France", True)
+        table.set_owned("Italy", True)
+        table.set_income("France", 150)
+        table.set_income("Spain", 999)  # Not owned, so not counted
+        assert table.total_income() == 150
+        assert table.owned_count() == 2
+        assert table.owned_population() == 60
+        assert table.owned_names() == ["France", "Italy"]
+        table.set_owned("France", False)
+        assert table.total_income() == 0
+        assert table.owned_names() == ["Italy"]
+        assert type(table.total_income()) is int
+
+
+def test_vectorized_needs_numpy(monkeypatch):
+    monkeypatch.setattr(regions, "np", None)
+    assert RegionTable(NAMES, [1] * 4, [1] * 4).vectorized is False
+    with pytest.raises(ImportError):
+        RegionTable(NAMES, [1] * 4, [1] * 4, vectorized=True)
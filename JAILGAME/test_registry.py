@@ -0,0 +1,61 @@
+from registry import BusinessRegistry, GangRegistry
+
+COUNTRIES = ["Poland", "France", "Spain"]
+TYPES = ["Gun Production", "Tax Frauds"]
+
+
+def test_member_ids_stay_put():
+    gang = GangRegistry(COUNTRIES)
+    ids = [gang.add() for _ in range(5)]
+    assert ids == [1, 2, 3, 4, 5]
+    gang.remove(2)
+    assert gang.name(3) == "Gang Member 3"
+    assert gang.add() == 6  # Ids are never reused
+
+
+def test_member_records_are_replaced_not_edited():
+    gang = GangRegistry(COUNTRIES)
+    member_id = gang.add()
+    before = gang.members.copy()
+    gang.assign(member_id, "Poland")
+    assert before[member_id].country is None
+    assert gang.country_of(member_id) == "Poland"
+
+
+def test_roster_order_and_rows():
+    gang = GangRegistry(COUNTRIES)
+    for _ in range(6):
+        gang.add()
+    gang.assign(1, "Spain")
+    gang.assign(2, "Poland")
+    gang.assign(3, "Spain")
+    expected = [(4, "Gang Member 4", None), (5, "Gang Member 5", None), (6, "Gang Member 6", None),
+                (2, "Gang Member 2", "Poland"), (1, "Gang Member 1", "Spain"), (3, "Gang Member 3", "Spain")]
+    assert gang.roster() == expected
+    assert gang.roster(4) == expected[:4]
+    assert [gang.roster_row(row) for row in range(7)] == expected + [None]
+
+
+def test_restored_member_ids_move_the_counter():
+    gang = GangRegistry(COUNTRIES)
+    gang.add("Old Timer", member_id=40)
+    assert gang.add() == 41
+
+
+def test_restored_business_ids_move_the_counter():
+    businesses = BusinessRegistry(COUNTRIES, TYPES)
+    assert businesses.add("Tax Frauds", "Spain", business_id=7) == 7
+    assert businesses.add("Gun Production", "France") == 8
+
+
+def test_business_moves_keep_ids_and_indexes():
+    businesses = BusinessRegistry(COUNTRIES, TYPES)
+    first = businesses.add("Gun Production", "Poland")
+    second = businesses.add("Tax Frauds", "France")
+    businesses.move(first, "Spain")
+    assert businesses.at("Poland") is None
+    assert businesses.at("Spain") == first
+    assert businesses.type_at("Spain") == "Gun Production"
+    businesses.remove(second)
+    assert businesses.listing() == [(first, "Gun Production", "Spain")]
+    assert businesses.count_of_type("Tax Frauds") == 0
@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+import saves
+from engine import GameEngine
+from saves import HEADER, SAVE_VERSION, Autosaver, decode_save, encode_save, load_game, save_game, set_aside
+
+
+def _played_game():
+    game = GameEngine()
+    game.money = 100_000
+    names = list(game.countries)
+    for country in names[:4]:
+        game.buy_country(country)
+    for _ in range(30):
+        game.buy_gang_member()
+    for member_id in list(game.gang.members)[:20]:
+        game.assign_member(member_id, names[member_id % 4])
+    game.sell_gang_member(game.gang.first_unassigned())
+    for business_type, country in zip(["Gun Production", "Tax Frauds", "Drug Production"], names):
+        game.start_business(business_type)
+        game.place_business(business_type, country)
+    game.cancel_business(2)
+    game.borrow(1000)
+    game.step(123.7)
+    game.pay_debt()  # Leaves money a float
+    game.borrow(500)
+    game.step(3.3)
+    game.change_hq(names[2])
+    return game
+
+
+def test_round_trip(tmp_path):
+    game = _played_game()
+    path = str(tmp_path / "game.jgs")
+    save_game(game, path)
+    loaded, saved_at = load_game(path)
+    assert loaded.snapshot() == game.snapshot()
+    assert type(loaded.money) is type(game.money)
+    assert loaded.income_per_second() == game.income_per_second()
+    assert loaded.income_sources() == game.income_sources()
+    assert loaded.gang.roster() == game.gang.roster()
+    assert loaded.gang.add() == game.gang.add()
+    assert loaded.businesses.add("Tax Frauds", "Spain") == game.businesses.add("Tax Frauds", "Spain")
+
+
+def test_bad_files_are_rejected():
+    data = encode_save(_played_game().snapshot(), 0.0)
+    newer = HEADER.pack(b"JGSV", SAVE_VERSION + 1, 0.0, 0, 0)
+    for bad in [b"", data[:HEADER.size + 5], data[:-1] + bytes([data[-1] ^ 1]), b"XXXX" + data[4:], newer]:
+        with pytest.raises(ValueError):
+            decode_save(bad)
+
+
+def test_unreadable_saves_are_kept_aside(tmp_path):
+    path = str(tmp_path / "game.jgs")
+    with open(path, "wb") as f:
+        f.write(b"JGSV not really a save")
+    with pytest.raises(ValueError):
+        load_game(path)
+    assert set_aside(path) == path + ".bad"
+    save_game(GameEngine(), path)  # The new game's save leaves the old file alone
+    with open(path + ".bad", "rb") as f:
+        assert f.read() == b"JGSV not really a save"
+
+
+def test_unknown_countries_are_rejected():
+    state = GameEngine().snapshot()
+    state["owned"] = ("Atlantis",)
+    with pytest.raises(ValueError):
+        GameEngine().restore(state)
+
+
+def test_autosaver_writes_the_last_state(tmp_path):
+    game = _played_game()
+    path = str(tmp_path / "auto.jgs")
+    saver = Autosaver(path, interval=0)
+    for _ in range(10):
+        game.step(1)
+        saver.maybe_save(game)
+    game.buy_gang_member()
+    saver.close(game)
+    assert saver.error is None
+    assert load_game(path)[0].snapshot() == game.snapshot()
+
+
+def test_autosaver_survives_a_failed_save(tmp_path, monkeypatch):
+    game = _played_game()
+    path = str(tmp_path / "auto.jgs")
+    encode = saves.encode_save
+    monkeypatch.setattr(saves, "encode_save", lambda state, saved_at: 1 / 0)
+    saver = Autosaver(path)
+    saver.save(game)
+    for _ in range(100):
+        if saver.error is not None:
+            break
+        time.sleep(0.01)
+    assert isinstance(saver.error, ZeroDivisionError)
+    monkeypatch.setattr(saves, "encode_save", encode)
+    saver.close(game)  # The worker is still running and writes this one
+    assert saver.error is None
+    assert load_game(path)[0].snapshot() == game.snapshot()
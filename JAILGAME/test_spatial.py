@@ -0,0 +1,45 @@
+import math
+import random
+
+import pytest
+
+from engine import COUNTRIES
+from spatial import SpatialIndex, point_in_polygon
+
+
+def _linear_scan(regions, point):
+    # First-match scan over every polygon, what the index replaces
+    for name, polygon in regions:
+        if point_in_polygon(point, polygon):
+            return name
+    return None
+
+
+def _synthetic_regions(count=200, seed=0):
+    rng = random.Random(seed)
+    regions = []
+    for i in range(count):
+        cx, cy, radius = rng.uniform(0, 800), rng.uniform(0, 600), rng.uniform(5, 40)
+        sides = rng.randrange(3, 12)
+        regions.append((f"R{i}", [(cx + radius * math.cos(2 * math.pi * k / sides),
+                                   cy + radius * math.sin(2 * math.pi * k / sides)) for k in range(sides)]))
+    return regions
+
+
+def _points(count, seed=1):
+    rng = random.Random(seed)
+    return [(rng.uniform(-20, 820), rng.uniform(-20, 620)) for _ in range(count)]
+
+
+def test_locate_matches_a_linear_scan():
+    for regions in (_synthetic_regions(), [(name, data["polygon"]) for name, data in COUNTRIES.items()]):
+        index = SpatialIndex(regions)
+        for point in _points(1000):
+            assert index.locate(point) == _linear_scan(regions, point)
+
+
+def test_locate_many_matches_locate():
+    pytest.importorskip("numpy")
+    index = SpatialIndex(_synthetic_regions())
+    points = _points(20000)
+    assert index.locate_many(points, chunk=4096).tolist() == [index.locate_id(point) for point in points]
@@ -0,0 +1,33 @@
+import json
+
+import startup
+from startup import StartupTimer
+
+
+def test_every_launch_is_logged(tmp_path, capsys):
+    path = str(tmp_path / "startup.jsonl")
+    for budget in (10.0, 0.0):
+        timer = StartupTimer(budget, log_path=path)
+        timer.mark("display")
+        timer.mark("first frame")
+        timer.report()
+    with open(path) as f:
+        entries = [json.loads(line) for line in f]
+    assert [entry["budget"] for entry in entries] == [10.0, 0.0]
+    assert list(entries[0]["phases"]) == ["display", "first frame"]
+    assert abs(entries[0]["total"] - sum(entries[0]["phases"].values())) < 1e-5
+    warnings = capsys.readouterr().out.splitlines()
+    assert len(warnings) == 1 and "over the 0.00s budget" in warnings[0]  # Only the second launch
+
+
+def test_log_keeps_the_newest_launches(tmp_path, monkeypatch):
+    path = str(tmp_path / "startup.jsonl")
+    monkeypatch.setattr(startup, "STARTUP_LOG_LIMIT", 2000)
+    for launch in range(40):
+        timer = StartupTimer(log_path=path)
+        timer.phases.append(("launch", launch))
+        timer.log()
+    with open(path) as f:
+        launches = [json.loads(line)["phases"]["launch"] for line in f]
+    assert launches[-1] == 39 and launches == list(range(launches[0], 40))
+    assert len(launches) < 40
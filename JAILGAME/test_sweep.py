@@ -0,0 +1,47 @@
+import pytest
+
+import sweep
+from engine import GameEngine
+from tournament import play_game
+
+
+def test_rule_paths_must_exist():
+    assert sweep.set_rule({}, "country_costs.France", 5) == {"country_costs": {"France": 5}}
+    assert sweep.set_rule({}, "borrow_interest_rates.500", 0.1) == {"borrow_interest_rates": {500: 0.1}}
+    for path in ("no_such_rule", "country_costs.France.extra", "country_costs.Frnace",
+                 "gang_member_cost.extra", "business_income_rates", "business_income_rates.Weed"):
+        with pytest.raises(KeyError):
+            sweep.set_rule({}, path, 1)
+    with pytest.raises(KeyError):
+        GameEngine(rules={"country_costs": {"Atlantis": 1}})
+
+
+def test_grid_points_cover_every_combination():
+    points = sweep.grid_points([("gang_member_cost", [100, 200]), ("country_costs.Spain", [1, 2, 3])])
+    assert len(points) == 6
+    assert {"gang_member_cost": 200, "country_costs": {"Spain": 3}} in points
+
+
+def test_cache_key_follows_the_rules_actually_used():
+    key = sweep.config_hash({}, ["gang_builder"], 2, 100, 0)
+    assert sweep.config_hash({"gang_member_cost": 150}, ["gang_builder"], 2, 100, 0) == key  # The default
+    assert sweep.config_hash({"gang_member_cost": 151}, ["gang_builder"], 2, 100, 0) != key
+
+
+def test_sweep_reuses_cached_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(sweep, "CACHE_DIR", str(tmp_path))
+    points = [{}, {"gang_member_cost": 100}]
+    first, simulated = sweep.run_sweep(points, ["poland_first"], 2, 200, processes=2)
+    assert simulated == 2
+    second, simulated = sweep.run_sweep(points, ["poland_first"], 2, 200, processes=2)
+    assert simulated == 0 and second == first
+
+
+def test_reshuffler_feels_sell_price_and_cancel_fee():
+    slow = {"country_costs": {country: 3000 for country in ("France", "Germany", "Spain", "Italy", "Poland")}}
+
+    def outcomes(**rules):
+        return [play_game("reshuffler", seed, 3600, dict(slow, **rules)) for seed in range(4)]
+    base = outcomes()
+    assert outcomes(gang_member_sell_price=10) != base
+    assert outcomes(business_cancel_fee=100) != base
@@ -0,0 +1,45 @@
+import pygame
+
+import text
+from text import GlyphAtlas, render_text
+
+pygame.font.init()
+FONT = pygame.font.Font(None, 24)
+BLACK = (0, 0, 0)
+
+
+def test_rendered_text_is_reused(monkeypatch):
+    monkeypatch.setattr(text, "_cache", text.OrderedDict())
+    first = render_text(FONT, "Owned: 1/5", BLACK)
+    assert render_text(FONT, "Owned: 1/5", BLACK) is first
+    assert render_text(FONT, "Owned: 1/5", (255, 0, 0)) is not first
+
+
+def test_cache_drops_the_least_recently_used(monkeypatch):
+    monkeypatch.setattr(text, "_cache", text.OrderedDict())
+    monkeypatch.setattr(text, "CACHE_SIZE", 2)
+    a = render_text(FONT, "a", BLACK)
+    render_text(FONT, "b", BLACK)
+    render_text(FONT, "a", BLACK)  # Now the newest
+    render_text(FONT, "c", BLACK)
+    assert list(text._cache) == [(FONT, "a", BLACK), (FONT, "c", BLACK)]
+    assert render_text(FONT, "a", BLACK) is a
+
+
+def test_atlas_lays_out_like_font_render():
+    atlas = GlyphAtlas(FONT, BLACK)
+    surface = pygame.Surface((300, 50))
+    for value in ("$1,234", "-50.5%", "12/03/2024"):
+        rect = atlas.draw(surface, value, topleft=(10, 5))
+        assert rect.topleft == (10, 5)
+        # Glyphs step by the font's own advances; font.render adds only the
+        # last glyph's overhang and rounding
+        assert rect.width == sum(metrics[4] for metrics in FONT.metrics(value))
+        assert 0 <= FONT.size(value)[0] - rect.width <= 3
+
+
+def test_atlas_falls_back_to_whole_strings():
+    atlas = GlyphAtlas(FONT, BLACK)
+    surface = pygame.Surface((300, 50))
+    rect = atlas.draw(surface, "Debt: $5", center=(150, 25))
+    assert rect.size == FONT.size("Debt: $5") and rect.center == (150, 25)
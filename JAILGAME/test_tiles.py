@@ -0,0 +1,58 @@
+import random
+
+import pygame
+
+import tiles
+from tiles import TilePyramid, build_pyramid
+
+
+def _picture(size, seed=0):
+    rng = random.Random(seed)
+    surface = pygame.Surface(size, 0, 32)
+    for _ in range(200):
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        surface.fill(color, (rng.randrange(size[0]), rng.randrange(size[1]), rng.randrange(1, 80), rng.randrange(1, 80)))
+    return surface
+
+
+def _stitched(pyramid, level):
+    surface = pygame.Surface(pyramid.levels[level], 0, 32)
+    columns, rows = pyramid.tile_count(level)
+    for row in range(rows):
+        for column in range(columns):
+            surface.blit(pyramid.tile(level, column, row), pyramid.tile_rect(level, column, row))
+    return surface
+
+
+def test_tiles_put_back_together_give_the_picture(tmp_path):
+    picture = _picture((700, 300))
+    build_pyramid(picture, str(tmp_path), "image")
+    pyramid = TilePyramid(str(tmp_path))
+    assert pyramid.levels == [(700, 300), (350, 150), (175, 75)]
+    assert pyramid.tile_count(0) == (3, 2) and pyramid.tile_rect(0, 2, 1).size == (700 - 512, 300 - 256)
+    assert pygame.image.tobytes(_stitched(pyramid, 0), "RGB") == pygame.image.tobytes(picture, "RGB")
+
+
+def test_mask_levels_keep_real_region_ids(tmp_path):
+    mask = pygame.Surface((600, 600), 0, 32)
+    ids = {0, 1, 2, 0x010203}
+    for i, region_id in enumerate(sorted(ids)):
+        mask.fill(pygame.Color(region_id >> 16, region_id >> 8 & 255, region_id & 255), (0, i * 150, 600, 150))
+    build_pyramid(mask, str(tmp_path), "mask")
+    pyramid = TilePyramid(str(tmp_path))
+    assert len(pyramid.levels) == 3
+    for level, (width, height) in enumerate(pyramid.levels):
+        seen = {pyramid.region_id(level, x, y) for x in range(0, width, 7) for y in range(0, height, 7)}
+        assert seen == ids
+    assert pyramid.region_id(0, 5, 599) == 0x010203 and pyramid.region_id(0, -1, 0) == 0
+
+
+def test_loaded_tiles_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(tiles, "TILE_SIZE", 16)
+    monkeypatch.setattr(tiles, "MAX_LOADED_TILES", 4)
+    build_pyramid(_picture((64, 64)), str(tmp_path), "image")
+    pyramid = TilePyramid(str(tmp_path))
+    for column in range(4):
+        for row in range(4):
+            pyramid.tile(0, column, row)
+    assert list(pyramid.loaded) == [(0, 3, row) for row in range(4)]
@@ -0,0 +1,14 @@
+from tournament import STRATEGIES, play_game, run_tournament, summarize
+
+
+def test_games_are_reproducible():
+    for name in STRATEGIES:
+        assert play_game(name, seed=3, max_seconds=300) == play_game(name, seed=3, max_seconds=300)
+
+
+def test_parallel_run_matches_single_games():
+    by_strategy = run_tournament(["poland_first", "gang_builder"], games=3, max_seconds=200, processes=2, seed=5)
+    for name, results in by_strategy.items():
+        expected = [play_game(name, 5 + i, 200) for i in range(3)]
+        assert sorted(results, key=lambda r: r["seed"]) == expected
+    assert "poland_first: " in summarize(by_strategy)
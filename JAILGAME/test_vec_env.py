@@ -0,0 +1,49 @@
+import numpy as np
+
+from vec_env import BORROW, BUY_COUNTRY, BUY_MEMBER, COUNTRY_FEATURES, GLOBAL_FEATURES, NOOP, VecGameEnv
+
+
+def test_observations_are_one_row_per_game():
+    env = VecGameEnv(3)
+    obs = env.reset()
+    assert obs.shape == (3, GLOBAL_FEATURES + COUNTRY_FEATURES * len(env.country_names))
+    assert obs.dtype == np.float32
+    obs, rewards, dones, info = env.step(env.sample_actions(np.random.default_rng(0)))
+    assert obs.shape[0] == rewards.shape[0] == dones.shape[0] == info["valid"].shape[0] == 3
+
+
+def test_actions_apply_to_their_own_game():
+    env = VecGameEnv(2)
+    env.reset()
+    obs, rewards, dones, info = env.step([[BUY_COUNTRY, 0, 0], [NOOP, 0, 0]])
+    assert info["valid"].tolist() == [True, True]
+    owned = obs[:, GLOBAL_FEATURES:GLOBAL_FEATURES + len(env.country_names)]
+    assert owned[0, 0] == 1 and owned[1].sum() == 0
+
+
+def test_illegal_actions_are_reported_no_ops():
+    env = VecGameEnv(2)
+    env.reset()
+    obs, rewards, dones, info = env.step([[BUY_MEMBER, 0, 0], [BUY_COUNTRY, 99, 0]])
+    assert info["valid"].tolist() == [False, False]
+    assert all(game.money == 0 and game.owned_count() == 0 for game in env.games)
+
+
+def test_reward_is_the_change_in_net_worth():
+    env = VecGameEnv(1, dt=10)
+    env.reset()
+    env.step([[BUY_COUNTRY, 0, 0]])
+    obs, rewards, dones, info = env.step([[BORROW, 0, 0]])
+    game = env.games[0]
+    assert rewards[0] == np.float32(game.money - game.bank_debt - game.bank_interest)  # Borrowing adds no worth
+    assert rewards[0] <= 0  # Interest only
+
+
+def test_finished_games_restart_in_place():
+    env = VecGameEnv(2, max_seconds=2)
+    env.reset()
+    env.step([[BUY_COUNTRY, 0, 0]] * 2)
+    obs, rewards, dones, info = env.step([[NOOP, 0, 0]] * 2)
+    assert dones.all()
+    assert all(game.game_time == 0 and game.owned_count() == 0 for game in env.games)
+    assert obs[:, GLOBAL_FEATURES:GLOBAL_FEATURES + len(env.country_names)].sum() == 0  # Fresh observations
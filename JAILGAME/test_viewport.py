@@ -0,0 +1,59 @@
+import pygame
+
+from engine import GameEngine
+from maps import DEFAULT_SIZE
+from masks import build_mask, scaled_regions
+from tiles import TilePyramid, build_pyramid
+from viewport import MAX_ZOOM, TiledMap, Viewport
+
+SCREEN = (800, 600)
+
+
+def test_screen_and_map_points_round_trip():
+    viewport = Viewport(DEFAULT_SIZE, SCREEN)
+    viewport.zoom_at((400, 300), 3)
+    viewport.pan(-50, 20)
+    for pos in ((0, 0), (123, 456), (799, 599)):
+        assert viewport.to_screen(viewport.to_map(pos)) == pos
+
+
+def test_zoom_keeps_the_point_under_the_cursor():
+    viewport = Viewport(DEFAULT_SIZE, SCREEN)
+    before = viewport.to_map((300, 200))
+    viewport.zoom_at((300, 200), 2)
+    after = viewport.to_map((300, 200))
+    assert abs(after[0] - before[0]) < 1e-9 and abs(after[1] - before[1]) < 1e-9
+    viewport.zoom_at((300, 200), 100)
+    assert viewport.zoom == MAX_ZOOM
+
+
+def test_view_never_leaves_the_map():
+    viewport = Viewport(DEFAULT_SIZE, SCREEN)
+    viewport.pan(-500, -500)
+    assert (viewport.x, viewport.y) == (0, 0)  # Zoom 1 shows the whole map
+    viewport.zoom_at((0, 0), 4)
+    viewport.pan(10 ** 6, 10 ** 6)
+    assert viewport.to_map(SCREEN) == DEFAULT_SIZE
+    viewport.reset()
+    assert viewport.key() == (1.0, 0.0, 0.0)
+
+
+def test_pick_agrees_with_country_at(tmp_path):
+    game = GameEngine()
+    size = (1600, 1200)  # Twice the map, so zooming in uses a finer level
+    build_pyramid(build_mask(scaled_regions(game.countries, size), size, processes=1), str(tmp_path), "mask")
+    tiled_map = TiledMap(None, TilePyramid(str(tmp_path)), game.countries)
+    viewport = Viewport(DEFAULT_SIZE, SCREEN)
+    hits = 0
+    for zoom in (1, 2.5, MAX_ZOOM):
+        viewport.reset()
+        viewport.zoom_at((400, 300), zoom)
+        for pos in ((x, y) for x in range(5, SCREEN[0], 37) for y in range(5, SCREEN[1], 41)):
+            x, y = viewport.to_map(pos)
+            # Rasterized edges may differ by a pixel; compare away from borders
+            around = {game.country_at((x + dx, y + dy)) for dx in (-2, 2) for dy in (-2, 2)}
+            if len(around) == 1:
+                country = around.pop()
+                assert tiled_map.pick(viewport, pos) == country
+                hits += country is not None
+    assert hits > 100
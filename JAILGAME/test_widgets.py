@@ -0,0 +1,56 @@
+import os
+
+import pygame
+
+from widgets import Modal, RowList, Widget
+
+
+def _tree():
+    dialog = Widget("dialog", (100, 100, 200, 150), [
+        Widget("close", (270, 100, 30, 30)),
+        RowList("rows", (100, 130, 200, 100), 25, [Widget("sell", (250, 130, 50, 25))]),
+    ])
+    panel = Widget("panel", (0, 0, 800, 50), [Widget("borrow", (10, 10, 80, 30))])
+    return Widget("root", None, [dialog, panel])
+
+
+def test_clicks_resolve_to_the_innermost_widget():
+    root = _tree()
+    assert root.hit((20, 20)) == ("borrow", None)
+    assert root.hit((500, 20)) == ("panel", None)
+    assert root.hit((280, 110)) == ("close", None)
+    assert root.hit((500, 500)) == (None, None)  # The root has no area of its own
+
+
+def test_rows_are_found_arithmetically():
+    root = _tree()
+    rows = root["dialog"]["rows"]
+    assert rows.rows == 4
+    assert root.hit((120, 180)) == ("rows", 2)
+    assert root.hit((260, 180)) == ("sell", 2)
+    assert rows.cell("sell", 2) == pygame.Rect(250, 180, 50, 25)
+
+
+def test_hidden_widgets_take_no_clicks():
+    root = _tree()
+    root["dialog"].hidden = True
+    assert root.hit((280, 110)) == (None, None)
+    assert root["dialog"].local(pygame.Rect(110, 120, 5, 5)).topleft == (10, 20)
+
+
+def test_modal_redraws_only_when_its_content_changes():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    screen = pygame.display.set_mode((400, 300))
+    modal = Modal("sell", _tree()["dialog"], member_id=3)
+    drawn = []
+
+    def render(modal, surface, content):
+        drawn.append(content)
+        surface.fill((255, 255, 255))
+    for content in (("Gang Member 3", 0), ("Gang Member 3", 0), ("Gang Member 3", 1)):
+        modal.draw(screen, content, render)
+    assert drawn == [("Gang Member 3", 0), ("Gang Member 3", 1)]
+    assert modal.data == {"member_id": 3}
+    assert screen.get_at((150, 150))[:3] == (255, 255, 255)
+    pygame.display.quit()
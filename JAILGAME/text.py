@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+import pygame
+
+# Text drawing for the game scripts. Rasterizing a string with font.render()
+# is the most expensive thing a HUD frame does, and nearly every label is the
+# same as last frame, so rendered surfaces are kept in a small LRU cache
+# keyed by (font, text, colour).
+#
+# Counters that change every tick (money, debt, the date) would churn that
+# cache, so they are laid out from a GlyphAtlas instead: each digit and
+# symbol is rendered once and a value is drawn as a row of glyph blits.
+
+CACHE_SIZE = 256
+ATLAS_CHARS = "0123456789$,.-+/:% "
+
+_cache = OrderedDict()
+
+
+def render_text(font, text, color):
+    key = (font, text, color)
+    surface = _cache.get(key)
+    if surface is None:
+        surface = font.render(text, True, color)
+        _cache[key] = surface
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return surface
+
+
+class GlyphAtlas:
+    def __init__(self, font, color, chars=ATLAS_CHARS):
+        self.font = font
+        self.color = color
+        self.glyphs = {}
+        for char, metrics in zip(chars, font.metrics(chars)):
+            # Step by the advance rather than the glyph width so spacing matches font.render
+            advance = metrics[4] if metrics else font.size(char)[0]
+            self.glyphs[char] = (font.render(char, True, color), advance)
+        self.height = max(glyph.get_height() for glyph, advance in self.glyphs.values())
+
+    def size(self, text):
+        return sum(self.glyphs[char][1] for char in text), self.height
+
+    def draw(self, surface, text, **position):
+        # position is a pygame.Rect keyword such as center=(x, y) or topleft=(x, y)
+        if any(char not in self.glyphs for char in text):
+            image = render_text(self.font, text, self.color)
+            rect = image.get_rect(**position)
+            surface.blit(image, rect)
+            return rect
+        rect = pygame.Rect((0, 0), self.size(text))
+        for name, value in position.items():
+            setattr(rect, name, value)
+        x = rect.x
+        blits = []
+        for char in text:
+            glyph, advance = self.glyphs[char]
+            blits.append((glyph, (x, rect.y)))
+            x += advance
+        surface.blits(blits, doreturn=False)
+        return rect
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import pygame
+
+from maps import DEFAULT_SIZE, load_map
+from masks import build_mask, scaled_regions
+
+# Tile pyramids for the zoomable map. An image is stored once at full
+# resolution and at every halving below it (a mipmap pyramid), each level
+# cut into TILE_SIZE squares of raw pixels on disk under .tile_cache/. The
+# game only ever loads the tiles it is showing, at the level whose
+# resolution matches the zoom, so a large world map is never decoded or
+# scaled as a whole after the first build.
+#
+# Two kinds share the layout:
+#   image  the map picture; halved with smoothscale, drawn to the screen
+#   mask   the region-ID mask (masks.py); halved without blending so every
+#          pixel stays a real region id, read back for click picking
+#
+# A pyramid's directory name carries a hash of its source, so editing the
+# map picture or the map data builds a fresh pyramid.
+
+TILE_SIZE = 256
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tile_cache")
+CACHE_VERSION = 1  # Bump when the tile layout changes
+MAX_LOADED_TILES = 96  # Decoded tiles kept in memory per pyramid
+
+
+def _pyramid_levels(surface, smooth):
+    levels = [surface]
+    while max(levels[-1].get_size()) > TILE_SIZE:
+        width, height = levels[-1].get_size()
+        half = ((width + 1) // 2, (height + 1) // 2)
+        scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+        levels.append(scale(levels[-1], half))
+    return levels
+
+
+def build_pyramid(surface, directory, kind):
+    # Writes every level of surface as tiles; meta.json goes last, so a
+    # directory with one is complete
+    smooth = kind == "image"
+    if surface.get_bitsize() < 24:  # smoothscale needs 24 or 32 bit pixels
+        wide = pygame.Surface(surface.get_size(), 0, 32)
+        wide.blit(surface, (0, 0))
+        surface = wide
+    levels = []
+    for level, image in enumerate(_pyramid_levels(surface, smooth)):
+        width, height = image.get_size()
+        os.makedirs(os.path.join(directory, str(level)), exist_ok=True)
+        for top in range(0, height, TILE_SIZE):
+            for left in range(0, width, TILE_SIZE):
+                rect = pygame.Rect(left, top, min(TILE_SIZE, width - left), min(TILE_SIZE, height - top))
+                # RGB: pictures are drawn opaque, and a mask's id is its RGB value
+                pixels = pygame.image.tobytes(image.subsurface(rect), "RGB")
+                with open(os.path.join(directory, str(level), f"{left // TILE_SIZE}_{top // TILE_SIZE}.raw"), "wb") as f:
+                    f.write(pixels)
+        levels.append([width, height])
+    meta = {"kind": kind, "tile": TILE_SIZE, "levels": levels}
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    return meta
+
+
+class TilePyramid:
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        self.kind = meta["kind"]
+        self.tile_size = meta["tile"]
+        self.levels = [tuple(size) for size in meta["levels"]]
+        self.loaded = OrderedDict()  # (level, column, row) -> surface
+
+    def tile_count(self, level):
+        width, height = self.levels[level]
+        return -(-width // self.tile_size), -(-height // self.tile_size)
+
+    def tile_rect(self, level, column, row):
+        width, height = self.levels[level]
+        left, top = column * self.tile_size, row * self.tile_size
+        return pygame.Rect(left, top, min(self.tile_size, width - left), min(self.tile_size, height - top))
+
+    def tile(self, level, column, row):
+        key = (level, column, row)
+        surface = self.loaded.get(key)
+        if surface is None:
+            rect = self.tile_rect(level, column, row)
+            with open(os.path.join(self.directory, str(level), f"{column}_{row}.raw"), "rb") as f:
+                surface = pygame.image.frombytes(f.read(), rect.size, "RGB")
+            if self.kind == "image" and pygame.display.get_surface():
+                surface = surface.convert()
+            self.loaded[key] = surface
+            if len(self.loaded) > MAX_LOADED_TILES:
+                self.loaded.popitem(last=False)
+        else:
+            self.loaded.move_to_end(key)
+        return surface
+
+    def region_id(self, level, x, y):
+        # Mask pyramids: the region id at pixel (x, y) of a level, 0 off the edge
+        width, height = self.levels[level]
+        if not (0 <= x < width and 0 <= y < height):
+            return 0
+        r, g, b, a = self.tile(level, x // self.tile_size, y // self.tile_size).get_at(
+            (x % self.tile_size, y % self.tile_size))
+        return r << 16 | g << 8 | b
+
+
+def _open_or_build(kind, name, digest, build):
+    directory = os.path.join(CACHE_DIR, f"{kind}-{name}-{digest[:16]}")
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        build_pyramid(build(), directory, kind)
+    return TilePyramid(directory)
+
+
+def image_pyramid(image_path):
+    with open(image_path, "rb") as f:
+        digest = hashlib.sha256(f.read() + f":{CACHE_VERSION}".encode()).hexdigest()
+    return _open_or_build("image", os.path.splitext(os.path.basename(image_path))[0], digest,
+                          lambda: pygame.image.load(image_path))
+
+
+def mask_pyramid(map_path, size, map_size=DEFAULT_SIZE):
+    # ID mask of the map's regions rasterized at size (usually the size of
+    # the map picture, so mask and picture tiles line up)
+    with open(map_path, "rb") as f:
+        digest = hashlib.sha256(f.read() + f":{size[0]}x{size[1]}:{CACHE_VERSION}".encode()).hexdigest()
+
+    def build():
+        countries = load_map(map_path, map_size)
+        return build_mask(scaled_regions(countries, size, map_size), size, processes=1)
+    return _open_or_build("mask", os.path.splitext(os.path.basename(map_path))[0], digest, build)
@@ -0,0 +1,207 @@
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import time
+
+from engine import GameEngine
+
+# Monte Carlo tournament: plays scripted strategies against the same starting
+# state on the headless engine, spread over every core with multiprocessing.
+#
+#   python tournament.py --games 2000 --max-seconds 3600
+#
+# A game is won when every country is owned. Each simulated second the
+# strategy gets a turn with probability ACTION_CHANCE, which stands in for a
+# human's reaction time and gives the runs their spread.
+
+ACTION_CHANCE = 0.5
+DEFAULT_MAX_SECONDS = 3600
+
+
+# ---- Strategy building blocks ----
+
+def _bootstrap_loan(game, amount):
+    # Nothing earns until a business exists, so a new gang has to borrow
+    if game.income_per_second() == 0 and game.bank_debt == 0 and game.money < game.rules["business_cost"]:
+        game.borrow(amount)
+
+
+def _fill_businesses(game, business_type):
+    for country in game.owned_countries_without_business():
+        if game.money < game.rules["business_cost"]:
+            break
+        game.start_business(business_type)
+        game.place_business(business_type, country)
+
+
+def _expand(game, rng):
+    affordable = [country for country, data in game.countries.items()
+                  if not data["owned"] and game.country_price(country) <= game.money]
+    if affordable:
+        game.buy_country(rng.choice(affordable))
+
+
+def _repay(game, reserve=0):
+    if game.bank_debt > 0 and game.money >= game.bank_debt + game.bank_interest + reserve:
+        game.pay_debt()
+
+
+# ---- Strategies ----
+# Each one is called with (game, rng) whenever the player gets a turn.
+
+def poland_first(game, rng):
+    if game.first_purchase:
+        game.buy_country("Poland")
+    _bootstrap_loan(game, 500)
+    _fill_businesses(game, rng.choice(list(game.rules["business_income_rates"])))
+    _repay(game)
+    _expand(game, rng)
+
+
+def borrow_early(game, rng):
+    if game.first_purchase:
+        game.buy_country(rng.choice(list(game.countries)))
+        game.borrow(5000)
+    _fill_businesses(game, rng.choice(list(game.rules["business_income_rates"])))
+    _expand(game, rng)
+    _repay(game, reserve=game.rules["business_cost"])
+
+
+def drugs_everywhere(game, rng):
+    if game.first_purchase:
+        game.buy_country(rng.choice(list(game.countries)))
+    _bootstrap_loan(game, 500)
+    _fill_businesses(game, "Drug Production")
+    _repay(game)
+    _expand(game, rng)
+
+
+def gang_builder(game, rng):
+    # Puts spare cash into gang members for the +10% per member bonus
+    drugs_everywhere(game, rng)
+    if game.owned_countries() and game.money >= game.rules["business_cost"]:
+        game.buy_gang_member()
+        with_business = [country for country in game.owned_countries() if game.business_in(country)]
+        member_id = game.gang.first_unassigned()
+        if member_id is not None and with_business:
+            game.assign_member(member_id, rng.choice(with_business))
+
+
+def reshuffler(game, rng):
+    # Opens whatever business comes to mind, then pays the cancel fee to swap
+    # weaker ones for the best earner. Once all are swapped, spare cash is
+    # parked in gang members, sold again when they close the gap to the next
+    # country. The only strategy that sells or cancels, so it is the one
+    # whose results move when sweeping gang_member_sell_price or
+    # business_cancel_fee (the latter only once country prices make games
+    # long enough to afford a swap).
+    if game.first_purchase:
+        game.buy_country(rng.choice(list(game.countries)))
+    _bootstrap_loan(game, 500)
+    rates = game.rules["business_income_rates"]
+    _fill_businesses(game, rng.choice(list(rates)))
+    best = max(rates, key=rates.get)
+    weaker = [business_id for business_id, business_type, country, income in game.income_sources()
+              if business_type != best]
+    if weaker and game.money >= game.rules["business_cancel_fee"] + game.rules["business_cost"]:
+        country = game.businesses.get(weaker[0]).country
+        game.cancel_business(weaker[0])
+        game.start_business(best)
+        game.place_business(best, country)
+    _repay(game)
+    prices = [game.country_price(country) for country, data in game.countries.items() if not data["owned"]]
+    if prices and 0 < min(prices) - game.money <= game.gang.unassigned_count() * game.rules["gang_member_sell_price"]:
+        while game.money < min(prices):
+            game.sell_gang_member(game.gang.first_unassigned())
+    _expand(game, rng)
+    if not weaker and game.money >= game.rules["gang_member_cost"]:
+        game.buy_gang_member()
+
+
+STRATEGIES = {
+    "poland_first": poland_first,
+    "borrow_early": borrow_early,
+    "drugs_everywhere": drugs_everywhere,
+    "gang_builder": gang_builder,
+    "reshuffler": reshuffler,
+}
+
+
+# ---- Running games ----
+
+def play_game(strategy_name, seed, max_seconds=DEFAULT_MAX_SECONDS, rules=None):
+    rng = random.Random(seed)
+    strategy = STRATEGIES[strategy_name]
+    game = GameEngine(rules=rules)
+    peak_debt = 0
+    win_time = None
+    for second in range(max_seconds):
+        if rng.random() < ACTION_CHANCE:
+            strategy(game, rng)
+        peak_debt = max(peak_debt, game.bank_debt)
+        if game.owned_count() == len(game.countries):
+            win_time = second
+            break
+        game.step(1.0)
+    return {
+        "strategy": strategy_name,
+        "seed": seed,
+        "win_time": win_time,
+        "peak_debt": peak_debt,
+        "final_money": game.money,
+        "final_debt": game.bank_debt + game.bank_interest,
+    }
+
+
+def _play_game_args(args):
+    return play_game(*args)
+
+
+def run_tournament(strategy_names, games, max_seconds=DEFAULT_MAX_SECONDS, processes=None, seed=0):
+    # Game i of every strategy uses the same seed, so strategies face the same dice
+    jobs = [(name, seed + i, max_seconds) for name in strategy_names for i in range(games)]
+    processes = processes or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (processes * 8))
+    with multiprocessing.Pool(processes) as pool:
+        results = list(pool.imap_unordered(_play_game_args, jobs, chunksize=chunksize))
+    by_strategy = {name: [] for name in strategy_names}
+    for result in results:
+        by_strategy[result["strategy"]].append(result)
+    return by_strategy
+
+
+def _distribution(values):
+    if not values:
+        return "n/a"
+    if len(values) == 1:
+        return f"{values[0]:,.0f}"
+    p10, p50, p90 = (statistics.quantiles(values, n=10, method="inclusive")[i] for i in (0, 4, 8))
+    return f"mean {statistics.fmean(values):,.0f}  p10 {p10:,.0f}  median {p50:,.0f}  p90 {p90:,.0f}"
+
+
+def summarize(by_strategy):
+    lines = []
+    for name, results in by_strategy.items():
+        win_times = [r["win_time"] for r in results if r["win_time"] is not None]
+        lines.append(f"{name}: {len(win_times)}/{len(results)} wins")
+        lines.append(f"  win time (s): {_distribution(win_times)}")
+        lines.append(f"  peak debt:    {_distribution([r['peak_debt'] for r in results])}")
+        lines.append(f"  final money:  {_distribution([r['final_money'] for r in results])}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play scripted strategies against each other on the headless engine.")
+    parser.add_argument("--games", type=int, default=1000, help="games per strategy")
+    parser.add_argument("--max-seconds", type=int, default=DEFAULT_MAX_SECONDS, help="game time limit per game")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    by_strategy = run_tournament(args.strategies, args.games, args.max_seconds, args.processes, args.seed)
+    print(summarize(by_strategy))
+    print(f"Played {args.games * len(args.strategies)} games in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,139 @@
+import numpy as np
+
+from engine import GameEngine
+
+# Batched reset()/step(actions) interface over the headless engine for bots
+# and automated agents. N independent games are stepped together and their
+# observations, rewards and done flags come back as arrays.
+#
+# An action is a row of three ints: (action type, arg0, arg1). arg0 is a
+# country index unless noted; arg1 is a business type index, a destination
+# country index or a borrow amount index depending on the action.
+
+NOOP = 0
+BUY_COUNTRY = 1        # arg0: country
+BUY_MEMBER = 2
+SELL_MEMBER = 3        # sells the first unassigned member
+ASSIGN_MEMBER = 4      # arg0: country (first unassigned member goes there)
+UNASSIGN_MEMBER = 5    # arg0: country
+START_BUSINESS = 6     # arg0: country, arg1: business type
+RELOCATE_BUSINESS = 7  # arg0: from country, arg1: to country
+CANCEL_BUSINESS = 8    # arg0: country
+BORROW = 9             # arg1: borrow amount
+PAY_DEBT = 10
+NUM_ACTIONS = 11
+
+GLOBAL_FEATURES = 6  # money, debt, interest, unassigned members, income/s, game time
+COUNTRY_FEATURES = 5  # owned, cost, gang members, business type, income/s
+
+
+class VecGameEnv:
+    def __init__(self, num_envs, dt=1.0, max_seconds=3600, rules=None, countries=None):
+        self.num_envs = num_envs
+        self.dt = dt
+        self.max_seconds = max_seconds
+        self.rules = rules
+        self.countries = countries
+        self.games = [self._new_game() for _ in range(num_envs)]
+        probe = self.games[0]
+        self.country_names = list(probe.countries)
+        self.business_types = list(probe.rules["business_income_rates"])
+        self.borrow_amounts = sorted(probe.rules["borrow_interest_rates"])
+        self.observation_size = GLOBAL_FEATURES + COUNTRY_FEATURES * len(self.country_names)
+        self._net_worth = np.zeros(num_envs, dtype=np.float64)
+
+    def _new_game(self):
+        return GameEngine(self.countries, rules=self.rules)
+
+    # ---- Gym-style API ----
+
+    def reset(self):
+        self.games = [self._new_game() for _ in range(self.num_envs)]
+        self._net_worth[:] = [self._worth(game) for game in self.games]
+        return self.observe()
+
+    def step(self, actions):
+        # actions: int array of shape (num_envs, 3)
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs, 3)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        valid = np.zeros(self.num_envs, dtype=bool)
+        for i, game in enumerate(self.games):
+            action, arg0, arg1 = actions[i]
+            valid[i] = self._apply(game, int(action), int(arg0), int(arg1))
+            game.step(self.dt)
+            worth = self._worth(game)
+            rewards[i] = worth - self._net_worth[i]
+            self._net_worth[i] = worth
+            if game.owned_count() == len(game.countries) or game.game_time >= self.max_seconds:
+                dones[i] = True
+                # Finished games restart in place so the batch stays full
+                self.games[i] = self._new_game()
+                self._net_worth[i] = self._worth(self.games[i])
+        return self.observe(), rewards, dones, {"valid": valid}
+
+    def observe(self):
+        obs = np.empty((self.num_envs, self.observation_size), dtype=np.float32)
+        business_index = {name: i + 1 for i, name in enumerate(self.business_types)}
+        for i, game in enumerate(self.games):
+            obs[i, :GLOBAL_FEATURES] = (game.money, game.bank_debt, game.bank_interest,
+                                        game.gang.unassigned_count(), game.income_per_second(), game.game_time)
+            regions = game.regions
+            per_country = obs[i, GLOBAL_FEATURES:].reshape(COUNTRY_FEATURES, -1)
+            per_country[0] = regions.owned
+            per_country[1] = regions.cost
+            per_country[2] = regions.gang_members
+            per_country[3] = [business_index.get(game.business_in(name), 0) for name in self.country_names]
+            per_country[4] = regions.income
+        return obs
+
+    # ---- Helpers ----
+
+    @staticmethod
+    def _worth(game):
+        return game.money - game.bank_debt - game.bank_interest
+
+    def _apply(self, game, action, arg0, arg1):
+        # Returns whether the action was legal; illegal actions are no-ops
+        names = self.country_names
+        country = names[arg0] if 0 <= arg0 < len(names) else None
+        if action == NOOP:
+            return True
+        if action == BUY_COUNTRY and country:
+            return game.buy_country(country)[0]
+        if action == BUY_MEMBER:
+            return game.buy_gang_member()[0]
+        if action == SELL_MEMBER and game.gang.unassigned_count():
+            return game.sell_gang_member(game.gang.first_unassigned())[0]
+        if action == ASSIGN_MEMBER and country and game.gang.unassigned_count():
+            return game.assign_member(game.gang.first_unassigned(), country)[0]
+        if action == UNASSIGN_MEMBER and country and game.gang.count_in(country):
+            return game.unassign_member(game.gang.first_in(country))[0]
+        if action == START_BUSINESS and country and 0 <= arg1 < len(self.business_types):
+            business_type = self.business_types[arg1]
+            if not game.countries[country]["owned"] or game.business_in(country) is not None:
+                return False
+            if not game.start_business(business_type)[0]:
+                return False
+            return game.place_business(business_type, country)[0]
+        if action == RELOCATE_BUSINESS and country and 0 <= arg1 < len(names):
+            business_id = game.businesses.at(country)
+            return business_id is not None and game.relocate_business(business_id, names[arg1])[0]
+        if action == CANCEL_BUSINESS and country:
+            business_id = game.businesses.at(country)
+            return business_id is not None and game.cancel_business(business_id)[0]
+        if action == BORROW and 0 <= arg1 < len(self.borrow_amounts):
+            return game.borrow(self.borrow_amounts[arg1])[0]
+        if action == PAY_DEBT:
+            return game.pay_debt()[0]
+        return False
+
+    def sample_actions(self, rng=None):
+        # Uniformly random actions, handy for smoke tests and baselines
+        rng = rng or np.random.default_rng()
+        actions = np.empty((self.num_envs, 3), dtype=np.int64)
+        actions[:, 0] = rng.integers(0, NUM_ACTIONS, self.num_envs)
+        actions[:, 1] = rng.integers(0, len(self.country_names), self.num_envs)
+        actions[:, 2] = rng.integers(0, max(len(self.country_names), len(self.business_types), len(self.borrow_amounts)),
+                                     self.num_envs)
+        return actions
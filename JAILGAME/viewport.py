@@ -0,0 +1,135 @@
+import math
+from collections import OrderedDict
+
+import pygame
+
+# Zoom and pan for the map. Map coordinates are the ones the country
+# outlines use (maps.DEFAULT_SIZE); the Viewport maps them onto the window,
+# where zoom 1 shows the whole map and MAX_ZOOM shows an eighth of it.
+#
+# TiledMap draws the map picture from an image TilePyramid (tiles.py): only
+# the tiles under the window are loaded, from the level whose resolution is
+# closest above the screen's, and each is scaled to its on-screen size once
+# and reused while the zoom stays put. Clicks are resolved in the matching
+# level of the region-ID mask pyramid.
+
+MIN_ZOOM = 1.0
+MAX_ZOOM = 8.0
+ZOOM_STEP = 1.25  # Per mouse wheel notch
+PAN_STEP = 60  # Screen pixels per arrow key press
+MAX_SCALED_TILES = 64
+
+
+class Viewport:
+    def __init__(self, map_size, screen_size):
+        self.map_size = map_size
+        self.screen_size = screen_size
+        self.zoom = MIN_ZOOM
+        self.x = self.y = 0.0  # Map point at the window's top-left corner
+
+    @property
+    def scale(self):
+        # Screen pixels per map unit on each axis
+        return (self.zoom * self.screen_size[0] / self.map_size[0],
+                self.zoom * self.screen_size[1] / self.map_size[1])
+
+    def key(self):
+        return (self.zoom, self.x, self.y)
+
+    def to_screen(self, point):
+        sx, sy = self.scale
+        return (round((point[0] - self.x) * sx), round((point[1] - self.y) * sy))
+
+    def to_map(self, pos):
+        sx, sy = self.scale
+        return (self.x + pos[0] / sx, self.y + pos[1] / sy)
+
+    def _clamp(self):
+        # Keep the map covering the whole window
+        self.x = min(max(self.x, 0.0), self.map_size[0] * (1 - 1 / self.zoom))
+        self.y = min(max(self.y, 0.0), self.map_size[1] * (1 - 1 / self.zoom))
+
+    def zoom_at(self, pos, factor):
+        # Zoom by factor, keeping the map point under pos where it is
+        before = self.to_map(pos)
+        self.zoom = min(max(self.zoom * factor, MIN_ZOOM), MAX_ZOOM)
+        sx, sy = self.scale
+        self.x, self.y = before[0] - pos[0] / sx, before[1] - pos[1] / sy
+        self._clamp()
+
+    def pan(self, dx, dy):
+        # Move the view by a screen-pixel offset
+        sx, sy = self.scale
+        self.x += dx / sx
+        self.y += dy / sy
+        self._clamp()
+
+    def reset(self):
+        self.zoom = MIN_ZOOM
+        self.x = self.y = 0.0
+
+
+class TiledMap:
+    def __init__(self, image, mask, names):
+        # image, mask: TilePyramids of the map picture and its region-ID mask;
+        # names: region names in mask id order
+        self.image = image
+        self.mask = mask
+        self.names = [None] + list(names)
+        self.scaled = OrderedDict()  # (level, column, row, width, height) -> surface
+
+    def level_for(self, pyramid, viewport):
+        # Coarsest level still at least as sharp as the screen
+        screen_per_pixel = max(viewport.scale[0] * viewport.map_size[0] / pyramid.levels[0][0],
+                               viewport.scale[1] * viewport.map_size[1] / pyramid.levels[0][1])
+        if screen_per_pixel >= 1:
+            return 0
+        return min(int(math.log2(1 / screen_per_pixel)), len(pyramid.levels) - 1)
+
+    def draw(self, surface, viewport):
+        pyramid = self.image
+        level = self.level_for(pyramid, viewport)
+        width, height = pyramid.levels[level]
+        # Screen pixels per level pixel, and where the level's origin lands.
+        # Tile edges are rounded from the level origin, not the view, so a
+        # tile's scaled size doesn't change while panning and tiles never gap.
+        kx = viewport.scale[0] * viewport.map_size[0] / width
+        ky = viewport.scale[1] * viewport.map_size[1] / height
+        origin = viewport.to_screen((0, 0))
+        columns, rows = pyramid.tile_count(level)
+        size = pyramid.tile_size
+        first_column = max(0, int(-origin[0] / kx) // size)
+        first_row = max(0, int(-origin[1] / ky) // size)
+        last_column = min(columns - 1, int((surface.get_width() - origin[0]) / kx) // size)
+        last_row = min(rows - 1, int((surface.get_height() - origin[1]) / ky) // size)
+        blits = []
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                rect = pyramid.tile_rect(level, column, row)
+                left, right = round(rect.left * kx), round(rect.right * kx)
+                top, bottom = round(rect.top * ky), round(rect.bottom * ky)
+                blits.append((self._scaled(level, column, row, (right - left, bottom - top)),
+                              (origin[0] + left, origin[1] + top)))
+        surface.blits(blits, doreturn=False)
+
+    def _scaled(self, level, column, row, size):
+        key = (level, column, row) + size
+        scaled = self.scaled.get(key)
+        if scaled is None:
+            tile = self.image.tile(level, column, row)
+            scaled = tile if tile.get_size() == size else pygame.transform.smoothscale(tile, size)
+            self.scaled[key] = scaled
+            if len(self.scaled) > MAX_SCALED_TILES:
+                self.scaled.popitem(last=False)
+        else:
+            self.scaled.move_to_end(key)
+        return scaled
+
+    def pick(self, viewport, pos):
+        # Name of the region under a screen position, or None
+        level = self.level_for(self.mask, viewport)
+        width, height = self.mask.levels[level]
+        x, y = viewport.to_map(pos)
+        region_id = self.mask.region_id(level, int(x * width / viewport.map_size[0]),
+                                        int(y * height / viewport.map_size[1]))
+        return self.names[region_id] if region_id < len(self.names) else None
@@ -0,0 +1,84 @@
+import pygame
+
+# Retained UI layout for the game scripts. Panels, dialogs and buttons are
+# laid out once at startup as a tree of named widgets. Drawing and click
+# handling read the same precomputed rects, and a click is resolved by one
+# walk down the tree to the widget under the cursor.
+#
+# hit(pos) returns (name, row): the name of the innermost widget under pos
+# (None if pos misses the tree) and, inside a RowList, the row index.
+#
+# Dialogs are opened as Modals on a stack: the top one receives every click,
+# and each is drawn into its own surface that is only redrawn when the
+# content it shows changes.
+
+
+class Widget:
+    def __init__(self, name, rect=None, children=()):
+        self.name = name
+        # A widget without a rect is a plain container for its children
+        self.rect = None if rect is None else pygame.Rect(rect)
+        self.children = list(children)
+        self.by_name = {child.name: child for child in self.children}
+        self.hidden = False
+
+    def __getitem__(self, name):
+        return self.by_name[name]
+
+    def local(self, rect):
+        # rect relative to this widget, for drawing into a surface of its size
+        return rect.move(-self.rect.x, -self.rect.y)
+
+    def hit(self, pos):
+        if self.hidden or (self.rect is not None and not self.rect.collidepoint(pos)):
+            return None, None
+        # Earlier children sit on top of later ones
+        for child in self.children:
+            name, row = child.hit(pos)
+            if name is not None:
+                return name, row
+        return (None, None) if self.rect is None else (self.name, None)
+
+
+class RowList(Widget):
+    # Equal-height rows, each with the same cells. Cells are laid out once for
+    # the first row; the rects of every row that fits in the list are
+    # precomputed, and hit() finds the row arithmetically.
+    def __init__(self, name, rect, row_height, cells=()):
+        super().__init__(name, rect, cells)
+        self.row_height = row_height
+        self.rows = -(-self.rect.height // row_height)  # A partly visible last row still counts
+        self.row_rects = [pygame.Rect(self.rect.x, self.rect.y + i * row_height, self.rect.width, row_height)
+                          for i in range(self.rows)]
+        self.cell_rects = {cell.name: [cell.rect.move(0, i * row_height) for i in range(self.rows)]
+                           for cell in self.children}
+
+    def cell(self, name, row):
+        return self.cell_rects[name][row]
+
+    def hit(self, pos):
+        if self.hidden or not self.rect.collidepoint(pos):
+            return None, None
+        row = (pos[1] - self.rect.y) // self.row_height
+        for cell in self.children:
+            if self.cell_rects[cell.name][row].collidepoint(pos):
+                return cell.name, row
+        return self.name, row
+
+
+class Modal:
+    def __init__(self, kind, widget, **data):
+        self.kind = kind
+        self.widget = widget
+        self.data = data
+        self.surface = None
+        self.content = None
+
+    def draw(self, screen, content, render):
+        # content: hashable summary of what the dialog shows right now.
+        # render(modal, surface, content) is only called when it changed.
+        if self.surface is None or content != self.content:
+            self.surface = pygame.Surface(self.widget.rect.size).convert()
+            render(self, self.surface, content)
+            self.content = content
+        screen.blit(self.surface, self.widget.rect)